@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Reproducible performance benchmark for feature extraction and the upload pipeline.
+
+Generates deterministic babble-like clips (seeded syllable trains with a
+voiced harmonic source, varying duration, sample rate and voicing density),
+then times every stage of the pipeline on each clip:
+
+  decode        libsndfile decode of the WAV bytes at the native rate
+  resample      native rate -> 16 kHz (librosa/soxr, as librosa.load does)
+  decode_mapped decode + resample as the server does it (zero-copy WAV view, one float32 buffer)
+  pitch_praat   Praat To Pitch on the 16 kHz buffer
+  pitch_yin     the NumPy YIN engine on the same buffer
+  pitch_vad     Praat on the regions kept by the voice-activity pre-pass
+  rms           RMS energy (per-hop sums of squares, no framed copy)
+  json          json.dumps of the full features and of the default encoded response
+  profile_<name> decode + extraction with each analysis profile (realtime,
+                standard, precise); the summary each one produced is kept in
+                the clip's "profiles" entry to compare accuracy
+  upload        full POST /upload-base-audio through the FastAPI app, with
+                recordings archived to the in-memory storage backend (or
+                STORAGE_BACKEND when set) and Gemini replaced by an
+                in-process stand-in; the worker's memory for the request is
+                recorded as extraction_memory
+
+Every stage records median/min wall time over --repeats runs and the peak of
+Python-tracked allocations (tracemalloc, which includes NumPy buffers).
+Results are written as JSON so two runs can be diffed:
+
+  python3 benchmark.py                              # writes benchmarks/<commit>.json
+  python3 benchmark.py --quick                      # smaller matrix
+  python3 benchmark.py --compare benchmarks/a.json  # print the ratio against an older run
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Caches would turn every repeat after the first into a lookup; the server stand-ins need these before import
+os.environ["FEATURE_CACHE_SIZE"] = "0"
+os.environ["FEATURE_CACHE_DIR"] = ""
+os.environ["ANALYSIS_CACHE_SIZE"] = "0"
+os.environ["ANALYSIS_CACHE_PATH"] = ""
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+BENCHMARK_DIR = "benchmarks"
+SEED = 1518
+
+DURATIONS = (5.0, 30.0, 120.0)
+SAMPLE_RATES = (16000, 44100, 48000)
+VOICING_DENSITIES = (0.2, 0.5, 0.8)
+QUICK = {"durations": (5.0, 30.0), "sample_rates": (16000, 44100), "voicing": (0.5,)}
+
+
+def babble(duration: float, sample_rate: int, voicing: float, seed: int = SEED) -> np.ndarray:
+    """
+    Deterministic babble-like signal: syllables of 80-300 ms with a rising or
+    falling f0 contour between 250 and 550 Hz, separated by pauses, with
+    `voicing` the fraction of time inside syllables.
+    """
+    rng = np.random.default_rng([seed, int(duration * 1000), sample_rate, int(voicing * 100)])
+    n = int(duration * sample_rate)
+    signal = np.zeros(n, dtype=np.float64)
+
+    position = 0
+    while position < n:
+        length = int(rng.uniform(0.08, 0.30) * sample_rate)
+        pause = int(length * (1 - voicing) / max(voicing, 1e-3) * rng.uniform(0.5, 1.5))
+        length = min(length, n - position)
+
+        f_start, f_end = rng.uniform(250, 550, size=2)
+        f0 = np.linspace(f_start, f_end, length)
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        # A few decaying harmonics, shaped by a smooth syllable envelope
+        syllable = sum(np.sin(k * phase) / k ** 1.5 for k in range(1, 7))
+        envelope = np.sin(np.pi * np.arange(length) / max(length, 1)) ** 2
+        signal[position:position + length] = rng.uniform(0.1, 0.4) * envelope * syllable
+        position += length + pause
+
+    signal += 0.002 * rng.standard_normal(n)
+    return signal.astype(np.float32)
+
+
+def wav_bytes(y: np.ndarray, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sample_rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def measure(fn, repeats: int):
+    """Median/min wall time (ms) and peak traced allocation (MB) of fn(), after one untimed warm-up call"""
+    fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "peak_mb": round(peak / 2 ** 20, 3),
+    }
+
+
+def upload_client():
+    """TestClient over the real app, with offline storage and Gemini replaced by a stand-in"""
+    # Read when main is imported; no Vercel Blob round trips unless asked for
+    os.environ.setdefault("STORAGE_BACKEND", "memory")
+    from fastapi.testclient import TestClient
+    import main
+
+    class FakeResponse:
+        text = json.dumps({"overall_status": "Benchmark", "risk_assessment": []})
+
+    class FakeModel:
+        async def generate_content_async(self, prompt):
+            return FakeResponse()
+
+    # Stands in for the client load() would create, so the SDK is never imported
+    main.GEMINI._model = FakeModel()
+    return TestClient(main.app)
+
+
+def benchmark_clip(y_native: np.ndarray, sample_rate: int, repeats: int, client) -> dict:
+    import librosa
+    from feature_engine import (
+        SAMPLE_RATE, RMS_FRAME_LENGTH, RMS_HOP_LENGTH, ANALYSIS_PROFILES, compute_features, decode_audio_bytes,
+        frame_rms, track_pitch, track_pitch_active,
+    )
+    from series_encoding import encode_features
+
+    content = wav_bytes(y_native, sample_rate)
+    stages = {}
+
+    decoded, stages["decode"] = measure(lambda: sf.read(io.BytesIO(content), dtype="float32")[0], repeats)
+    y, stages["resample"] = measure(
+        lambda: librosa.resample(decoded, orig_sr=sample_rate, target_sr=SAMPLE_RATE)
+        if sample_rate != SAMPLE_RATE else decoded,
+        repeats,
+    )
+    _, stages["decode_mapped"] = measure(lambda: decode_audio_bytes(content), repeats)
+    _, stages["pitch_praat"] = measure(lambda: track_pitch(y, SAMPLE_RATE, "praat"), repeats)
+    _, stages["pitch_yin"] = measure(lambda: track_pitch(y, SAMPLE_RATE, "yin"), repeats)
+    _, stages["pitch_vad"] = measure(lambda: track_pitch_active(y, SAMPLE_RATE, "praat"), repeats)
+    _, stages["rms"] = measure(
+        lambda: frame_rms(y, -(RMS_FRAME_LENGTH // 2), 1 + len(y) // RMS_HOP_LENGTH), repeats
+    )
+
+    features = compute_features(y, SAMPLE_RATE)
+    _, stages["json_full"] = measure(lambda: json.dumps(encode_features(features, points=0)), repeats)
+    _, stages["json_encoded"] = measure(lambda: json.dumps(encode_features(features)), repeats)
+
+    profiles = {}
+    for name, profile in ANALYSIS_PROFILES.items():
+        extracted, stages[f"profile_{name}"] = measure(
+            lambda: compute_features(decode_audio_bytes(content, quality=profile.resample_quality), SAMPLE_RATE, profile),
+            repeats,
+        )
+        profiles[name] = {key: extracted[key] for key in ("avg_pitch", "pitch_variability", "avg_energy", "voicing_ratio")}
+
+    def upload():
+        response = client.post("/upload-base-audio", files={"file": ("bench.wav", content, "audio/wav")})
+        body = response.json()
+        if body.get("status") != "success":
+            raise RuntimeError(f"Upload failed: {body}")
+        return len(response.content), body["memory"]
+
+    (response_bytes, memory), stages["upload"] = measure(upload, repeats)
+
+    return {
+        "wav_bytes": len(content),
+        "response_bytes": response_bytes,
+        "extraction_memory": memory,
+        "voicing_ratio": features["voicing_ratio"],
+        "profiles": profiles,
+        "stages": stages,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, previous_path: str) -> None:
+    with open(previous_path) as f:
+        previous = json.load(f)
+    old = {clip["name"]: clip for clip in previous["clips"]}
+
+    print(f"\n📊 {previous.get('commit', '?')} -> {current['commit']} (median ms, ratio > 1 is slower)")
+    for clip in current["clips"]:
+        before = old.get(clip["name"])
+        if not before:
+            continue
+        print(f"   {clip['name']}")
+        for stage, result in clip["stages"].items():
+            if stage not in before["stages"]:
+                continue
+            was, now = before["stages"][stage]["median_ms"], result["median_ms"]
+            if not was:
+                continue
+            ratio = now / was
+            flag = "⚠️" if ratio > 1.2 else "  "
+            print(f"   {flag} {stage:<16} {was:>10.2f} -> {now:>10.2f}  x{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="smaller clip matrix")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help=f"results file (default: {BENCHMARK_DIR}/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    durations = QUICK["durations"] if args.quick else DURATIONS
+    sample_rates = QUICK["sample_rates"] if args.quick else SAMPLE_RATES
+    densities = QUICK["voicing"] if args.quick else VOICING_DENSITIES
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeats": args.repeats,
+        "seed": SEED,
+        "clips": [],
+    }
+
+    # JIT-compile librosa's numba kernels before anything is timed
+    from feature_engine import warm_up
+    warm_up()
+
+    with upload_client() as client:
+        for duration in durations:
+            for sample_rate in sample_rates:
+                for voicing in densities:
+                    name = f"{duration:g}s@{sample_rate}Hz/v{voicing:g}"
+                    print(f"⏱️  {name}")
+                    clip = benchmark_clip(babble(duration, sample_rate, voicing), sample_rate, args.repeats, client)
+                    clip.update({"name": name, "duration": duration, "sample_rate": sample_rate, "voicing": voicing})
+                    results["clips"].append(clip)
+                    for stage, result in clip["stages"].items():
+                        print(f"   {stage:<16} {result['median_ms']:>10.2f} ms   peak {result['peak_mb']:.2f} MB")
+                    memory = clip["extraction_memory"]
+                    print(f"   {'worker RSS':<16} {memory['peak_rss_mb']:>10.1f} MB peak, "
+                          f"+{memory['rss_growth_mb']} MB for the upload")
+
+    # ru_maxrss is KiB on Linux
+    results["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    output = args.output or os.path.join(BENCHMARK_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {output} (max RSS {results['max_rss_mb']} MB)")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Cold-start check for the API server.
+
+Starts uvicorn the way Render does, measures how long it takes until GET /
+answers (the health check) and until warm-up has finished ("ready": true),
+and lists the slowest imports of src/main.py. Exits non-zero when the health
+check misses STARTUP_BUDGET_SECONDS.
+
+Run from the repo root: python3 check_startup.py
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "2"))
+READY_TIMEOUT_SECONDS = 120
+SLOWEST_IMPORTS = 10
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def slowest_imports():
+    """Top-level cumulative import times (seconds) reported by python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=os.path.join(ROOT, "src"), capture_output=True, text=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Only packages imported directly by main or its sibling modules (two levels of indentation)
+        if len(name) - len(name.lstrip()) <= 3:
+            timings.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(timings, reverse=True)[:SLOWEST_IMPORTS]
+
+
+def main():
+    print("📦 Slowest imports of src/main.py:")
+    for seconds, name in slowest_imports():
+        print(f"   {seconds:6.3f}s  {name}")
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    serving = ready = None
+    try:
+        while time.perf_counter() - started < READY_TIMEOUT_SECONDS:
+            try:
+                body = httpx.get(url, timeout=1.0).json()
+            except httpx.HTTPError:
+                time.sleep(0.02)
+                continue
+            if serving is None:
+                serving = time.perf_counter() - started
+            if body.get("ready"):
+                ready = time.perf_counter() - started
+                break
+            time.sleep(0.05)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    print()
+    if serving is None:
+        print(f"❌ Server never answered {url}")
+        sys.exit(1)
+    print(f"🩺 Health check answered after {serving:.2f}s (budget {STARTUP_BUDGET_SECONDS:g}s)")
+    print(f"🔥 Workers and baseline ready after {ready:.2f}s" if ready else "⚠️ Warm-up did not finish")
+
+    if serving > STARTUP_BUDGET_SECONDS:
+        print("❌ Startup budget exceeded")
+        sys.exit(1)
+    print("✅ Within startup budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -54,12 +54,17 @@ if os.path.exists("src/main.py"):
         content = f.read()
         
     # Check for key functions
+    blob_client = ""
+    if os.path.exists("src/blob_storage.py"):
+        with open("src/blob_storage.py", "r") as f:
+            blob_client = f.read()
+    
     checks = {
-        "upload_to_blob function": "def upload_to_blob" in content,
-        "download_from_blob function": "def download_from_blob" in content,
-        "list_blobs function": "def list_blobs" in content,
-        "BLOB_TOKEN variable": "BLOB_TOKEN" in content,
-        "requests import": "import requests" in content,
+        "BlobClient.put method": "async def put" in blob_client,
+        "BlobClient.get method": "async def get" in blob_client,
+        "BlobClient.list_all method": "async def list_all" in blob_client,
+        "STORAGE_BACKEND selection": "make_storage(STORAGE_BACKEND)" in content,
+        "storage import": "from storage import" in content,
     }
     
     print("\nCode checks:")
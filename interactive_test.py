@@ -3,14 +3,20 @@
 Interactive Test Suite for Mimicoo Audio Analysis
 Run this to test your entire setup step-by-step
 """
+import asyncio
 import os
 import sys
 import time
+import httpx
 import requests
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
 load_dotenv()
 
+from storage import STORAGE_BACKEND, make_storage
+
 GREEN = '\033[92m'
 RED = '\033[91m'
 YELLOW = '\033[93m'
@@ -41,7 +47,9 @@ def test_env_variables():
     blob_token = os.getenv("BLOB_READ_WRITE_TOKEN")
     gemini_key = os.getenv("GEMINI_API_KEY")
     
-    if blob_token:
+    if STORAGE_BACKEND != "vercel":
+        print_info(f"STORAGE_BACKEND={STORAGE_BACKEND}, no Blob token needed")
+    elif blob_token:
         print_success(f"BLOB_READ_WRITE_TOKEN found: {blob_token[:20]}...")
     else:
         print_error("BLOB_READ_WRITE_TOKEN not found in .env")
@@ -57,38 +65,43 @@ def test_env_variables():
 
 def test_blob_storage():
     """Test 2: Check Blob Storage connection"""
-    print_header("TEST 2: Vercel Blob Storage")
+    print_header(f"TEST 2: Storage ({STORAGE_BACKEND})")
     
-    blob_token = os.getenv("BLOB_READ_WRITE_TOKEN")
-    headers = {"Authorization": f"Bearer {blob_token}"}
+    async def list_blobs():
+        storage = make_storage()
+        if STORAGE_BACKEND == "vercel":
+            storage.max_retries = 0
+        try:
+            return {"blobs": await storage.list_all()}
+        finally:
+            await storage.aclose()
     
     try:
-        response = requests.get("https://blob.vercel-storage.com/", headers=headers, timeout=10)
+        listing = asyncio.run(list_blobs())
         
-        if response.status_code == 200:
-            blobs = response.json().get("blobs", [])
-            print_success(f"Connected to Blob Storage - {len(blobs)} files found")
-            
-            # Check for base.wav
-            base_found = False
-            for blob in blobs:
-                pathname = blob.get("pathname", "")
-                if pathname == "base.wav":
-                    print_success(f"base.wav found: {blob['size']} bytes")
-                    print_info(f"URL: {blob['url']}")
-                    base_found = True
-                    break
-            
-            if not base_found:
-                print_warning("base.wav not found in Blob Storage")
-                print_info("Run: python3 upload_base_to_blob.py")
-                return False
-            
-            return True
-        else:
-            print_error(f"Failed to connect: HTTP {response.status_code}")
+        blobs = listing.get("blobs", [])
+        print_success(f"Connected to Blob Storage - {len(blobs)} files found")
+        
+        # Check for base.wav
+        base_found = False
+        for blob in blobs:
+            pathname = blob.get("pathname", "")
+            if pathname == "base.wav":
+                print_success(f"base.wav found: {blob['size']} bytes")
+                print_info(f"URL: {blob['url']}")
+                base_found = True
+                break
+        
+        if not base_found:
+            print_warning("base.wav not found in Blob Storage")
+            print_info("Run: python3 upload_base_to_blob.py")
             return False
-            
+        
+        return True
+    
+    except httpx.HTTPStatusError as e:
+        print_error(f"Failed to connect: HTTP {e.response.status_code}")
+        return False
     except Exception as e:
         print_error(f"Connection error: {e}")
         return False
@@ -112,10 +125,10 @@ def test_local_files():
     if os.path.exists("requirements.txt"):
         print_success("requirements.txt found")
         with open("requirements.txt") as f:
-            if "requests" in f.read():
-                print_success("requests library in requirements.txt")
+            if "httpx" in f.read():
+                print_success("httpx library in requirements.txt")
             else:
-                print_error("requests library missing from requirements.txt")
+                print_error("httpx library missing from requirements.txt")
                 return False
     else:
         print_error("requirements.txt not found!")
@@ -0,0 +1,141 @@
+"""
+Memoized Gemini risk assessments.
+
+The prompt only depends on ten summary numbers (five baseline, five upload),
+so entries are keyed on those values quantized to ANALYSIS_CACHE_PRECISION
+significant digits, plus the analysis profile, the baseline fingerprint and
+a hash of the prompt template and model. Entries expire after
+ANALYSIS_CACHE_TTL seconds, the least recently used ones are evicted beyond
+ANALYSIS_CACHE_SIZE, and the cache can optionally be persisted to
+ANALYSIS_CACHE_PATH across restarts.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "512"))
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", str(24 * 3600)))
+ANALYSIS_CACHE_PRECISION = int(os.getenv("ANALYSIS_CACHE_PRECISION", "3"))
+# Persistence is disabled unless a file path is configured
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH")
+
+SUMMARY_KEYS = ("avg_pitch", "pitch_variability", "avg_energy", "voicing_ratio", "duration")
+
+
+def quantize(value: float, precision: int) -> float:
+    """Round to `precision` significant digits"""
+    return float(f"{float(value):.{precision}g}")
+
+
+def quantize_summary(features: Dict, precision: int) -> Dict[str, float]:
+    return {key: quantize(features[key], precision) for key in SUMMARY_KEYS}
+
+
+def template_hash(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
+
+
+class AnalysisCache:
+    def __init__(self, max_entries: int = ANALYSIS_CACHE_SIZE, ttl: float = ANALYSIS_CACHE_TTL,
+                 precision: int = ANALYSIS_CACHE_PRECISION, path: Optional[str] = ANALYSIS_CACHE_PATH):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.precision = precision
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        # key -> (expires_at, analysis)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        if path:
+            self._load()
+
+    def key(self, uploaded_features: Dict, base_features: Dict, baseline_id: str, prompt_id: str) -> str:
+        payload = {
+            "uploaded": quantize_summary(uploaded_features, self.precision),
+            "base": quantize_summary(base_features, self.precision),
+            # Analysis profile the uploaded features were extracted with (None for live sessions)
+            "profile": uploaded_features.get("profile"),
+            "baseline": baseline_id,
+            "prompt": prompt_id,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, analysis = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return analysis
+            del self._entries[key]
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, analysis: Dict) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.time() + self.ttl, analysis)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def snapshot(self) -> Dict:
+        """Unexpired entries as a JSON-ready dict (oldest first)"""
+        now = time.time()
+        return {key: entry for key, entry in self._entries.items() if entry[0] > now}
+
+    def save(self, entries: Optional[Dict] = None) -> None:
+        """Write entries to ANALYSIS_CACHE_PATH (atomic replace)"""
+        if not self.path:
+            return
+        entries = self.snapshot() if entries is None else entries
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug("Ignoring unreadable analysis cache %s: %s", self.path, e)
+            return
+
+        now = time.time()
+        for key, (expires_at, analysis) in entries.items():
+            if expires_at > now:
+                self._entries[key] = (expires_at, analysis)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        logger.debug("Loaded %s cached analyses from %s", len(self._entries), self.path)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "precision": self.precision,
+            "persistent": bool(self.path),
+        }
@@ -0,0 +1,106 @@
+"""
+Versioned, immutable snapshot of the base (reference) audio features.
+
+The base.wav features are computed once and published as a frozen snapshot.
+Requests grab the current snapshot reference once and use it for the whole
+request, so a reload that happens mid-request can never hand them a
+half-updated set of features.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Awaitable, Callable, Dict, Mapping, Optional
+
+import numpy as np
+
+from series_encoding import encode_features
+
+SUMMARY_KEYS = ("avg_pitch", "pitch_variability", "avg_energy", "voicing_ratio", "duration")
+# Encoded responses kept per snapshot, one per distinct set of series options
+ENCODED_CACHE_SIZE = 16
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, np.ndarray):
+        # Read-only view, shared with every response instead of copied
+        frozen = value.view()
+        frozen.flags.writeable = False
+        return frozen
+    return value
+
+
+@dataclass(frozen=True)
+class BaselineSnapshot:
+    version: int
+    source: str
+    features: Mapping[str, object]
+    loaded_at: float = field(default_factory=time.time)
+    # series options -> encode_features() result, filled as requests ask for them
+    _encoded: Dict[tuple, Dict] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @property
+    def summary(self) -> Dict[str, float]:
+        """The five scalar features used for comparison and the Gemini prompt"""
+        return {key: self.features[key] for key in SUMMARY_KEYS}
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the summary features, stable across restarts (unlike version)"""
+        return hashlib.sha256(json.dumps(self.summary, sort_keys=True).encode()).hexdigest()[:16]
+
+    def as_response(self) -> Dict:
+        """Plain dict copy of the features, safe to hand to the JSON encoder"""
+        return dict(self.features)
+
+    def encoded(self, series_options: Dict) -> Dict:
+        """encode_features() of the features, computed once per set of options (treat it as read-only)"""
+        key = tuple(sorted(series_options.items()))
+        body = self._encoded.get(key)
+        if body is None:
+            body = encode_features(self.as_response(), **series_options)
+            if len(self._encoded) >= ENCODED_CACHE_SIZE:
+                # Oldest first, dicts keep insertion order
+                del self._encoded[next(iter(self._encoded))]
+            self._encoded[key] = body
+        return body
+
+
+class BaselineStore:
+    """Holds the current BaselineSnapshot and swaps it atomically on reload"""
+
+    def __init__(self):
+        self._snapshot: Optional[BaselineSnapshot] = None
+        self._version = 0
+        self._reload_lock = asyncio.Lock()
+
+    @property
+    def current(self) -> Optional[BaselineSnapshot]:
+        return self._snapshot
+
+    async def reload(self, loader: Callable[[], Awaitable[Optional[tuple]]]) -> Optional[BaselineSnapshot]:
+        """
+        Build a new snapshot with `loader` and publish it.
+
+        `loader` returns a (source, features) tuple, or None when no base audio
+        could be found. On failure the previous snapshot stays in place.
+        """
+        async with self._reload_lock:
+            loaded = await loader()
+            if not loaded:
+                return None
+
+            source, features = loaded
+            self._version += 1
+            snapshot = BaselineSnapshot(
+                version=self._version,
+                source=source,
+                features=MappingProxyType({key: _freeze(value) for key, value in features.items()}),
+            )
+            # Single reference assignment: readers see either the old or the new snapshot
+            self._snapshot = snapshot
+            return snapshot
@@ -0,0 +1,183 @@
+"""
+Read-through disk cache for Blob Storage downloads.
+
+Every downloaded blob is kept in BLOB_CACHE_DIR under the hash of its URL,
+next to the ETag it was served with. The next download of the same URL
+sends If-None-Match and, on a 304, reuses the cached file. When the caller
+already knows the current ETag (from the Blob manifest) and it matches,
+there is no request at all. Files are handed to callers as hard links, so
+the caller may delete its copy and eviction never pulls a file out from
+under a reader.
+
+The directory can be shared by every server process on the machine:
+entries are written to a temp file and renamed into place, and each URL has
+a lock file (flock) so two processes never download the same blob at once.
+The least recently used entries (by mtime, which hits refresh) are evicted
+once the cache holds more than BLOB_CACHE_BYTES. Where flock isn't
+available the locks are skipped; the atomic renames still keep entries
+whole.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BLOB_CACHE_DIR = os.getenv("BLOB_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "mimicoo-blob-cache")
+# Total size of cached blobs (bytes); 0 disables the cache
+BLOB_CACHE_BYTES = int(os.getenv("BLOB_CACHE_BYTES", str(512 * 2 ** 20)))
+# How often a download waiting for another process's lock on the same URL checks again
+LOCK_POLL_SECONDS = 0.05
+
+COUNTER_NAMES = ("hits", "revalidated", "misses", "stale_served", "evictions")
+
+
+@dataclass(frozen=True)
+class CachedBlob:
+    path: str
+    etag: Optional[str]
+    size: int
+
+
+class BlobDiskCache:
+    def __init__(self, directory: str = BLOB_CACHE_DIR, max_bytes: int = BLOB_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Per process; the directory itself is shared
+        self.counters = {name: 0 for name in COUNTER_NAMES}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def count(self, name: str) -> None:
+        self.counters[name] += 1
+
+    def _path(self, url: str, extension: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest()[:32] + extension)
+
+    @staticmethod
+    def _try_lock(path: str) -> Optional[int]:
+        """Exclusive lock on `path` without blocking, the fd to release or None if it's held elsewhere"""
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:
+            return fd
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        # Eviction deletes lock files; a lock on a file that was deleted (and maybe recreated)
+        # meanwhile excludes nobody, so it only counts if the path still names the locked file
+        try:
+            if os.stat(path).st_ino == os.fstat(fd).st_ino:
+                return fd
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+        return None
+
+    @asynccontextmanager
+    async def locked(self, url: str) -> AsyncIterator[None]:
+        """Hold the URL's lock (across processes and coroutines) for the block"""
+        os.makedirs(self.directory, exist_ok=True)
+        lock_path = self._path(url, ".lock")
+        # Polled rather than blocking, so waiting never stalls the event loop
+        while (fd := self._try_lock(lock_path)) is None:
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            os.close(fd)
+
+    def lookup(self, url: str) -> Optional[CachedBlob]:
+        """The cached copy of `url`, call with its lock held"""
+        data_path = self._path(url, ".blob")
+        try:
+            with open(self._path(url, ".json")) as f:
+                meta = json.load(f)
+            size = os.path.getsize(data_path)
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or meta.get("size") != size:
+            return None
+        return CachedBlob(path=data_path, etag=meta.get("etag"), size=size)
+
+    def temp_path(self) -> str:
+        """A fresh file in the cache directory to download into (same filesystem, so store() can rename it)"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        return path
+
+    def store(self, url: str, downloaded_path: str, etag: Optional[str]) -> CachedBlob:
+        """Move a finished download into the cache, call with the URL's lock held"""
+        size = os.path.getsize(downloaded_path)
+        data_path = self._path(url, ".blob")
+        os.replace(downloaded_path, data_path)
+        meta_fd, meta_tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(meta_fd, "w") as f:
+            json.dump({"url": url, "etag": etag, "size": size}, f)
+        os.replace(meta_tmp, self._path(url, ".json"))
+        return CachedBlob(path=data_path, etag=etag, size=size)
+
+    def materialize(self, cached: CachedBlob, local_path: str) -> None:
+        """Put the cached file at local_path (a hard link when possible) and mark it as recently used"""
+        if os.path.exists(local_path):
+            os.unlink(local_path)
+        try:
+            os.link(cached.path, local_path)
+        except OSError:
+            shutil.copyfile(cached.path, local_path)
+        os.utime(cached.path)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        entries = []
+        for name in names:
+            if name.endswith(".blob"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name[:-len(".blob")]))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                return
+            base = os.path.join(self.directory, key)
+            fd = self._try_lock(base + ".lock")
+            if fd is None:
+                # Being downloaded or read right now, so not the least recently used
+                continue
+            try:
+                # The lock file last and while still holding it, so the directory doesn't fill with them
+                for extension in (".blob", ".json", ".lock"):
+                    try:
+                        os.unlink(base + extension)
+                    except FileNotFoundError:
+                        pass
+            finally:
+                os.close(fd)
+            total -= size
+            self.count("evictions")
+
+    def stats(self) -> Dict:
+        return {**self.counters, "directory": self.directory, "max_bytes": self.max_bytes}
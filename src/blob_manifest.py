@@ -0,0 +1,147 @@
+"""
+Local manifest of the objects in Blob Storage.
+
+Looking a blob up by name used to mean listing the whole store and scanning
+it. The manifest keeps pathname -> (url, size, etag) for every blob in a
+dict, with a sorted copy of the pathnames for prefix queries, so a lookup
+is a dict access (or a bisect) with no network call.
+
+The manifest is filled from the paginated list API the first time it is
+used and refreshed every BLOB_MANIFEST_TTL seconds after that. A stale
+manifest keeps answering while one background refresh runs, so only the very
+first lookup waits for the listing. Uploads through BlobClient are added
+right away; blobs written by other processes (upload_base_to_blob.py, other
+server instances) show up with the next refresh, or immediately after
+refresh() (POST /admin/reload-baseline calls it).
+"""
+import asyncio
+import bisect
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the manifest is re-listed from Blob Storage
+BLOB_MANIFEST_TTL = float(os.getenv("BLOB_MANIFEST_TTL", "300"))
+
+
+@dataclass(frozen=True)
+class BlobEntry:
+    pathname: str
+    url: str
+    size: Optional[int] = None
+    etag: Optional[str] = None
+    uploaded_at: Optional[str] = None
+
+    @classmethod
+    def from_api(cls, blob: Dict) -> "BlobEntry":
+        """From an item of the list API or the body of a PUT response"""
+        return cls(
+            pathname=blob["pathname"],
+            url=blob["url"],
+            size=blob.get("size"),
+            etag=blob.get("etag"),
+            uploaded_at=blob.get("uploadedAt"),
+        )
+
+
+# Returns every blob in the store, all pages included
+Lister = Callable[[], Awaitable[List[Dict]]]
+
+
+class BlobManifest:
+    def __init__(self, list_all: Lister, ttl: float = BLOB_MANIFEST_TTL):
+        self.list_all = list_all
+        self.ttl = ttl
+        self._entries: Dict[str, BlobEntry] = {}
+        # Sorted pathnames, for prefix queries
+        self._pathnames: List[str] = []
+        self._loaded_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Blobs written while a listing is in flight, which that listing may predate
+        self._written_during_refresh: Optional[Dict[str, BlobEntry]] = None
+        self.lookups = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    @property
+    def stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    async def refresh(self) -> bool:
+        """Re-list the store now (concurrent callers share one listing), False if it failed"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        # Shielded so a cancelled request can't cancel a listing others are waiting on
+        return await asyncio.shield(self._refresh_task)
+
+    async def _refresh(self) -> bool:
+        self._written_during_refresh = {}
+        try:
+            blobs = await self.list_all()
+        except Exception as e:
+            self._written_during_refresh = None
+            self.refresh_failures += 1
+            logger.error("Failed to refresh the Blob manifest, keeping %s known blobs: %s", len(self._entries), e)
+            return False
+
+        entries = {}
+        for blob in blobs:
+            if blob.get("pathname") and blob.get("url"):
+                entry = BlobEntry.from_api(blob)
+                entries[entry.pathname] = entry
+        entries.update(self._written_during_refresh)
+        self._written_during_refresh = None
+        self._entries = entries
+        self._pathnames = sorted(entries)
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+        logger.debug("Blob manifest refreshed: %s blobs", len(entries))
+        return True
+
+    async def _ensure_loaded(self) -> None:
+        self.lookups += 1
+        if self._loaded_at is None:
+            await self.refresh()
+        elif self.stale and (self._refresh_task is None or self._refresh_task.done()):
+            # Serve what we have, the listing runs in the background
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    def add(self, blob: Dict) -> Optional[BlobEntry]:
+        """Record a blob that was just written"""
+        if not blob.get("pathname") or not blob.get("url"):
+            return None
+        entry = BlobEntry.from_api(blob)
+        if entry.pathname not in self._entries:
+            bisect.insort(self._pathnames, entry.pathname)
+        self._entries[entry.pathname] = entry
+        if self._written_during_refresh is not None:
+            self._written_during_refresh[entry.pathname] = entry
+        return entry
+
+    async def get(self, pathname: str) -> Optional[BlobEntry]:
+        await self._ensure_loaded()
+        return self._entries.get(pathname)
+
+    async def with_prefix(self, prefix: str) -> List[BlobEntry]:
+        """Entries whose pathname starts with `prefix`, in pathname order"""
+        await self._ensure_loaded()
+        matches = []
+        index = bisect.bisect_left(self._pathnames, prefix)
+        while index < len(self._pathnames) and self._pathnames[index].startswith(prefix):
+            matches.append(self._entries[self._pathnames[index]])
+            index += 1
+        return matches
+
+    def stats(self) -> Dict:
+        return {
+            "blobs": len(self._entries),
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+            "ttl_seconds": self.ttl,
+            "lookups": self.lookups,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+        }
@@ -0,0 +1,262 @@
+"""
+Async Vercel Blob Storage client, the "vercel" storage backend (see storage.py).
+
+One shared httpx.AsyncClient keeps connections to blob.vercel-storage.com
+alive (HTTP/2 when the h2 package is installed) instead of opening a new
+TCP/TLS connection for every call. Transient failures are retried with
+exponential backoff and full jitter, and downloads (and uploads of spooled
+files) are streamed to and from disk in chunks. Downloads go through a
+revalidated disk cache (see blob_cache.py).
+"""
+import asyncio
+import logging
+import os
+import random
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from blob_cache import BlobDiskCache, CachedBlob
+from storage import StorageBackend
+from telemetry import stage
+
+logger = logging.getLogger(__name__)
+
+BLOB_API_URL = "https://blob.vercel-storage.com"
+
+BLOB_CONNECT_TIMEOUT = float(os.getenv("BLOB_CONNECT_TIMEOUT", "5"))
+BLOB_TIMEOUT = float(os.getenv("BLOB_TIMEOUT", "30"))
+BLOB_MAX_RETRIES = int(os.getenv("BLOB_MAX_RETRIES", "3"))
+BLOB_RETRY_BACKOFF = float(os.getenv("BLOB_RETRY_BACKOFF", "0.5"))
+BLOB_MAX_CONNECTIONS = int(os.getenv("BLOB_MAX_CONNECTIONS", "10"))
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Blobs per list request (the API's maximum)
+LIST_PAGE_SIZE = 1000
+
+# Status codes worth retrying; everything else is returned to the caller as-is
+RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class _FileChunks:
+    """Async iterable over a file's chunks; every iteration re-reads it, so retries resend the whole file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def __aiter__(self):
+        with open(self.path, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+
+class BlobClient(StorageBackend):
+    name = "vercel"
+
+    def __init__(self, token: Optional[str], base_url: str = BLOB_API_URL,
+                 timeout: float = BLOB_TIMEOUT, max_retries: int = BLOB_MAX_RETRIES,
+                 backoff: float = BLOB_RETRY_BACKOFF, cache: Optional[BlobDiskCache] = None):
+        super().__init__()
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._timeout = httpx.Timeout(timeout, connect=BLOB_CONNECT_TIMEOUT)
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache = cache or BlobDiskCache()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so the client binds to the event loop that first uses it
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=self._timeout,
+                limits=httpx.Limits(max_connections=BLOB_MAX_CONNECTIONS,
+                                    max_keepalive_connections=BLOB_MAX_CONNECTIONS),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    async def _sleep_before_retry(self, attempt: int) -> None:
+        # Full jitter: uniform in [0, backoff * 2^attempt]
+        await asyncio.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying transport errors and retryable status codes"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.debug("Blob %s %s failed (%r), retrying...", method, url, e)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+                logger.debug("Blob %s %s returned %s, retrying...", method, url, response.status_code)
+            await self._sleep_before_retry(attempt)
+
+    async def put(self, pathname: str, content: bytes) -> Optional[str]:
+        """Upload file to Vercel Blob Storage and return the URL"""
+        return await self._put(pathname, content, len(content), {})
+
+    async def put_file(self, path: str, pathname: str) -> Optional[str]:
+        """Upload a file from disk, streamed in chunks instead of read into memory"""
+        size = os.path.getsize(path)
+        return await self._put(pathname, _FileChunks(path), size, {"Content-Length": str(size)})
+
+    async def _put(self, filename: str, content, size: int, headers: Dict[str, str]) -> Optional[str]:
+        with stage("blob_put"):
+            try:
+                logger.debug("Uploading %s to Vercel Blob...", filename)
+                response = await self._request(
+                    "PUT",
+                    f"{self.base_url}/{filename}",
+                    headers={**self._auth_headers(), **headers},
+                    content=content,
+                    params={"filename": filename},
+                )
+
+                if response.status_code == 200:
+                    blob = response.json()
+                    blob_url = blob.get("url")
+                    # The PUT response has no size, the manifest gets the one we sent
+                    self.manifest.add({"size": size, **blob})
+                    logger.debug("Successfully uploaded to: %s", blob_url)
+                    return blob_url
+                else:
+                    logger.error("Failed to upload to Blob: %s - %s", response.status_code, response.text)
+                    return None
+
+            except Exception as e:
+                logger.error("Error uploading to Blob: %s", e)
+                return None
+
+    async def get(self, blob_url: str, local_path: str, etag: Optional[str] = None) -> bool:
+        """Put a blob at local_path, from the disk cache when the cached copy is still current
+
+        A cached copy with the given `etag` is used without any request.
+        """
+        with stage("blob_get"):
+            if not self.cache.enabled:
+                return await self._fetch(blob_url, local_path) is not None
+
+            async with self.cache.locked(blob_url):
+                cached = self.cache.lookup(blob_url)
+                if cached and etag and cached.etag == etag:
+                    self.cache.count("hits")
+                else:
+                    cached = await self._revalidate(blob_url, cached)
+                if cached is None:
+                    return False
+                self.cache.materialize(cached, local_path)
+            # listdir + stat of the whole cache directory, kept off the event loop
+            await asyncio.to_thread(self.cache.evict)
+            logger.debug("Blob %s ready at: %s", blob_url, local_path)
+            return True
+
+    async def _revalidate(self, blob_url: str, cached: Optional[CachedBlob]) -> Optional[CachedBlob]:
+        """Conditional GET against the cached copy, returns the now current cached copy (None on failure)"""
+        headers = {"If-None-Match": cached.etag} if cached and cached.etag else {}
+        temp_path = self.cache.temp_path()
+        try:
+            response = await self._fetch(blob_url, temp_path, headers)
+            if response is None:
+                if cached:
+                    # Blob Storage unreachable: the last known copy beats failing the request
+                    logger.warning("⚠️ Using cached copy of %s, Blob Storage could not be reached", blob_url)
+                    self.cache.count("stale_served")
+                return cached
+            if response.status_code == 304:
+                self.cache.count("revalidated")
+                return cached
+            self.cache.count("misses")
+            return self.cache.store(blob_url, temp_path, response.headers.get("etag"))
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    async def _fetch(self, blob_url: str, local_path: str,
+                     headers: Optional[Dict[str, str]] = None) -> Optional[httpx.Response]:
+        """Stream a blob to local_path in chunks, returns the (closed) response, None on failure
+
+        A 304 answer to a conditional request is returned as-is, with nothing written.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                logger.debug("Downloading from Blob: %s", blob_url)
+                async with self.client.stream("GET", blob_url, headers=headers) as response:
+                    if response.status_code == 304:
+                        logger.debug("Blob not modified: %s", blob_url)
+                        return response
+                    if response.status_code != 200:
+                        if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                            await self._sleep_before_retry(attempt)
+                            continue
+                        logger.error("Failed to download from Blob: %s", response.status_code)
+                        return None
+
+                    with open(local_path, 'wb') as f:
+                        async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+
+                logger.debug("Successfully downloaded to: %s", local_path)
+                return response
+
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    logger.error("Error downloading from Blob: %s", e)
+                    return None
+                await self._sleep_before_retry(attempt)
+            except Exception as e:
+                logger.error("Error downloading from Blob: %s", e)
+                return None
+        return None
+
+    async def fetch_list(self, cursor: Optional[str] = None, limit: int = LIST_PAGE_SIZE) -> dict:
+        """One page of the blob listing ({"blobs", "cursor", "hasMore"}), raising httpx errors on failure"""
+        params = {"limit": str(limit)}
+        if cursor:
+            params["cursor"] = cursor
+        with stage("blob_list"):
+            response = await self._request("GET", f"{self.base_url}/", headers=self._auth_headers(), params=params)
+            response.raise_for_status()
+            return response.json()
+
+    async def list_all(self) -> List[Dict]:
+        """Every blob in storage, following the listing's cursor across pages"""
+        blobs: List[Dict] = []
+        cursor = None
+        while True:
+            page = await self.fetch_list(cursor)
+            blobs.extend(page.get("blobs", []))
+            cursor = page.get("cursor")
+            if not page.get("hasMore") or not cursor:
+                return blobs
+
+    async def stream(self, blob_url: str) -> AsyncIterator[bytes]:
+        async with self.client.stream("GET", blob_url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                yield chunk
+
+    def stats(self) -> Dict:
+        return {**super().stats(), "cache": self.cache.stats()}
@@ -0,0 +1,173 @@
+"""
+Extraction backend that keeps Praat/librosa work off the uvicorn event loop.
+
+The default backend is a pre-warmed ProcessPoolExecutor: every worker imports
+librosa and parselmouth once and runs a warm-up extraction when it starts, so
+the numba JIT cost is paid at startup instead of on the first upload.
+
+Every job also reports the worker's peak resident memory while it ran, so
+the memory cost of a request can be measured from its response and /stats,
+along with the time its stages (decode, pitch, RMS) took inside the worker,
+which the server adds to its metrics and the request's Server-Timing header.
+"""
+import asyncio
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+import telemetry
+
+logger = logging.getLogger(__name__)
+
+# "process" (default) or "thread" (single process, handy for local debugging)
+EXTRACTION_BACKEND = os.getenv("EXTRACTION_BACKEND", "process")
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(2, os.cpu_count() or 1))))
+# Jobs allowed to wait for a free worker before new ones are rejected
+EXTRACTION_MAX_QUEUE = int(os.getenv("EXTRACTION_MAX_QUEUE", "8"))
+
+
+class PoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+    def __init__(self, stats: Dict):
+        super().__init__(f"Extraction pool saturated ({stats['queue_depth']}/{stats['max_queue_depth']} queued)")
+        self.stats = stats
+
+
+def _init_worker(cache_counters: Dict) -> None:
+    telemetry.configure_logging()
+    import feature_engine
+    # Report cache hits/misses into counters the server process can read
+    feature_engine.FEATURE_CACHE.counters = cache_counters
+    feature_engine.warm_up()
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's peak-RSS mark of this process (Linux only), False where unsupported"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _proc_status_mb(field: str) -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory (MB) since reset_peak_rss(), or over the process lifetime where it can't be reset"""
+    peak = _proc_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+    import resource
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 1024), 1)
+
+
+def _measured(fn: Callable, *args):
+    """Worker side of run_measured: fn's result, the worker's memory while it ran and fn's stage timings"""
+    resettable = reset_peak_rss()
+    before = _proc_status_mb("VmRSS")
+    with telemetry.collect() as timings:
+        result = fn(*args)
+    memory = {"peak_rss_mb": peak_rss_mb(), "rss_growth_mb": None}
+    if resettable and before is not None:
+        # Memory the job itself needed on top of what the worker already held
+        memory["rss_growth_mb"] = round(memory["peak_rss_mb"] - before, 1)
+    logger.debug("Extraction memory: %s", memory)
+    return result, memory, timings
+
+
+class ExtractionPool:
+    def __init__(self, backend: str = EXTRACTION_BACKEND, workers: int = EXTRACTION_WORKERS,
+                 max_queue: int = EXTRACTION_MAX_QUEUE):
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = None
+        self._in_flight = 0
+        self._last_memory = None
+        self._max_peak_rss_mb = None
+
+    async def start(self) -> None:
+        """Create the executor and wait until every worker has warmed up"""
+        import feature_engine
+        initargs = (feature_engine.FEATURE_CACHE.counters,)
+
+        if self.backend == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs)
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs)
+
+        # Submitting one task per worker makes the executor spawn all of them now
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _worker_ready) for _ in range(self.workers)
+        ])
+        logger.debug("Extraction pool ready: backend=%s, workers=%s", self.backend, self.workers)
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "queue_depth": max(0, self._in_flight - self.workers),
+            "max_queue_depth": self.max_queue,
+            "last_job_memory": self._last_memory,
+            "max_peak_rss_mb": self._max_peak_rss_mb,
+        }
+
+    async def run(self, fn: Callable, *args):
+        """Run fn(*args) on a worker, raising PoolSaturated instead of queueing without bound"""
+        result, _ = await self.run_measured(fn, *args)
+        return result
+
+    async def run_measured(self, fn: Callable, *args) -> Tuple[object, Dict]:
+        """
+        Like run(), also returning the worker's memory during the job: peak_rss_mb
+        and rss_growth_mb (peak minus the RSS at job start, None where the peak
+        can't be reset).
+
+        With the thread backend all jobs share one process, so concurrent jobs
+        are included in each other's peak.
+        """
+        if self._executor is None:
+            raise RuntimeError("Extraction pool has not been started")
+
+        if self._in_flight >= self.workers + self.max_queue:
+            raise PoolSaturated(self.stats())
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            with telemetry.stage("extraction"):
+                result, memory, timings = await loop.run_in_executor(self._executor, _measured, fn, *args)
+        finally:
+            self._in_flight -= 1
+        # Decode/pitch/RMS as measured inside the worker
+        for name, seconds in timings.items():
+            telemetry.record(name, seconds)
+        self._last_memory = memory
+        self._max_peak_rss_mb = max(memory["peak_rss_mb"], self._max_peak_rss_mb or 0.0)
+        return result, memory
@@ -1,13 +1,18 @@
-import numpy as np
-import librosa
-import parselmouth
+"""
+Command-line helpers around feature_engine: numpy-array features for plotting.
+
+The extraction itself lives in feature_engine (shared with the API server),
+matplotlib is only imported when something is actually plotted.
+"""
 import os
-import matplotlib.pyplot as plt
 
+import numpy as np
+
+import feature_engine
 # Global constants (can be imported by other files)
-SAMPLE_RATE = 16000
-MIN_F0 = 75.0 # Hz
-MAX_F0 = 500.0 # Hz 
+from feature_engine import SAMPLE_RATE, MIN_F0, MAX_F0
+
+SERIES_KEYS = ("pitch_time_series", "pitch_timestamps", "rms_time_series", "rms_timestamps")
 
 def extract_audio_features(audio_path: str):
     """
@@ -18,70 +23,31 @@ def extract_audio_features(audio_path: str):
         audio_path: The file path to the audio (.wav, .mp3, etc.).
 
     Returns:
-        A dictionary containing the summary statistics and time-series data, or None if an error occurs.
+        A dictionary containing the summary statistics and time-series data (as numpy
+        arrays), or None if an error occurs.
     """
     if not os.path.exists(audio_path):
         print(f"Error: Audio file not found at {audio_path}")
         return None
 
     print(f"\nAnalyzing {os.path.basename(audio_path)}...")
-    try:
-        # --- Pitch (F0) Extraction using Parselmouth ---
-        sound = parselmouth.Sound(audio_path)
-        duration = sound.get_total_duration() 
-        
-        pitch = sound.to_pitch(time_step=0.01, pitch_floor=MIN_F0, pitch_ceiling=MAX_F0)
-        
-        pitch_time_series = pitch.selected_array['frequency']
-        
-        pitch_interval = pitch.get_time_step() 
-        pitch_timestamps = np.arange(len(pitch_time_series)) * pitch_interval
-        
-        # Voiced segments analysis
-        voiced_pitch_values = pitch_time_series[pitch_time_series > 0]
-        
-        total_frames = len(pitch_time_series)
-        voiced_frames = len(voiced_pitch_values)
-        voicing_ratio = voiced_frames / total_frames if total_frames > 0 else 0.0
-
-        if len(voiced_pitch_values) > 0:
-            avg_pitch = float(np.mean(voiced_pitch_values))
-            pitch_variability = float(np.std(voiced_pitch_values))
-        else:
-            avg_pitch = 0.0
-            pitch_variability = 0.0
-        
-        # --- Energy (RMS) Extraction using Librosa ---
-        y, sr = librosa.load(audio_path, sr=SAMPLE_RATE)
-        # Using standard frame/hop lengths for general RMS calculation
-        rms_data = librosa.feature.rms(y=y, frame_length=2048, hop_length=512)
-        rms_time_series = rms_data[0]
-
-        rms_timestamps = librosa.frames_to_time(np.arange(len(rms_time_series)), sr=sr, hop_length=512)
-
-        avg_energy = float(np.mean(rms_time_series))
-
-        return {
-            "file_name": os.path.basename(audio_path),
-            "avg_pitch": round(avg_pitch, 2), 
-            "pitch_variability": round(pitch_variability, 4),
-            "avg_energy": round(avg_energy, 4),
-            "voicing_ratio": round(voicing_ratio, 4),
-            "duration": round(duration, 2), 
-            "pitch_time_series": pitch_time_series,
-            "pitch_timestamps": pitch_timestamps,
-            "rms_time_series": rms_time_series,
-            "rms_timestamps": rms_timestamps,
-        }
-
-    except Exception as e:
-        print(f"An error occurred during feature extraction for {os.path.basename(audio_path)}: {e}")
+    features = feature_engine.extract_audio_features(audio_path)
+    if not features:
+        print(f"An error occurred during feature extraction for {os.path.basename(audio_path)}")
         return None
 
+    features = dict(features)
+    for key in SERIES_KEYS:
+        features[key] = np.asarray(features[key])
+    features["file_name"] = os.path.basename(audio_path)
+    return features
+
 def plot_audio_features(features, audio_path):
     """
     Plots the time-series data for Pitch and RMS Energy of a single audio file.
     """
+    import matplotlib.pyplot as plt
+
     plt.style.use('ggplot')
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
     fig.suptitle(f"Acoustic Feature Analysis: {os.path.basename(audio_path)}", fontsize=16)
@@ -114,4 +80,4 @@ def plot_audio_features(features, audio_path):
     ax2.legend(loc='upper right')
 
     plt.tight_layout(rect=[0, 0, 1, 0.96])
-    plt.show()
\ No newline at end of file
+    plt.show()
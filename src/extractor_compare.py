@@ -1,11 +1,11 @@
-import numpy as np
 import os
-import matplotlib.pyplot as plt
 from extractor import extract_audio_features 
 
-current_directory = os.getcwd()
+AUDIO_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'audio')
 
 def plot_comparison(features1, features2):
+    import matplotlib.pyplot as plt
+
     plt.style.use('seaborn-v0_8-whitegrid')
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
     fig.suptitle("Acoustic Feature Comparison (Pitch & Energy)", fontsize=18, fontweight='bold')
@@ -58,8 +58,8 @@ def plot_comparison(features1, features2):
     plt.show()
 
 if __name__ == '__main__':
-    AUDIO_FILE_1 = os.path.join(current_directory, r'..\audio\base.wav')
-    AUDIO_FILE_2 = os.path.join(current_directory, r'..\audio\compare.wav')
+    AUDIO_FILE_1 = os.path.join(AUDIO_DIRECTORY, 'base.wav')
+    AUDIO_FILE_2 = os.path.join(AUDIO_DIRECTORY, 'compare.wav')
 
     features_file1 = extract_audio_features(AUDIO_FILE_1)
     features_file2 = extract_audio_features(AUDIO_FILE_2)
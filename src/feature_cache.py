@@ -0,0 +1,189 @@
+"""
+Content-addressed cache for extract_audio_features results.
+
+Entries are keyed by the SHA-256 of the decoded 16 kHz PCM plus every
+analysis parameter, so re-uploads of the same recording skip Praat and
+librosa, and changing any analysis constant misses automatically.
+
+Two tiers: a size-bounded in-memory LRU per process, and an optional
+on-disk tier (FEATURE_CACHE_DIR) shared by all extraction workers that
+stores the time series as compressed npz.
+"""
+import contextvars
+import hashlib
+import json
+import multiprocessing
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURE_CACHE_SIZE = int(os.getenv("FEATURE_CACHE_SIZE", "64"))
+# Disk tier is disabled unless a directory is configured
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR")
+
+SUMMARY_KEYS = ("avg_pitch", "pitch_variability", "avg_energy", "voicing_ratio", "duration")
+COUNTER_NAMES = ("memory_hits", "disk_hits", "misses")
+
+# Set inside FeatureCache.bypassed(): every lookup misses and nothing is stored. A context
+# variable, so with the thread backend other requests' extractions keep using the cache
+_BYPASS: contextvars.ContextVar[bool] = contextvars.ContextVar("feature_cache_bypass", default=False)
+
+
+def _read_only(features: Dict, copy: bool) -> Dict:
+    """`features` with read-only arrays, so callers handed a cached entry can't alter it in place"""
+    frozen = dict(features)
+    for name, value in frozen.items():
+        if isinstance(value, np.ndarray):
+            if copy:
+                value = value.copy()
+            value.flags.writeable = False
+            frozen[name] = value
+    return frozen
+
+
+def make_counters() -> Dict[str, "multiprocessing.sharedctypes.Synchronized"]:
+    """Hit/miss counters that stay valid when handed to worker processes"""
+    return {name: multiprocessing.Value('q', 0) for name in COUNTER_NAMES}
+
+
+def file_key(sha256: str, params: Dict) -> str:
+    """Key for an uploaded file by the hash of its bytes, looked up before anything is decoded"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    digest.update(f"file:{sha256}".encode())
+    return digest.hexdigest()
+
+
+def content_key(y: np.ndarray, params: Dict) -> str:
+    """SHA-256 over the decoded samples and the analysis parameters"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    digest.update(str(y.dtype).encode())
+    # Hashed through the buffer protocol, no bytes copy of the signal
+    digest.update(memoryview(np.ascontiguousarray(y)).cast("B"))
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    def __init__(self, max_entries: int = FEATURE_CACHE_SIZE, disk_dir: Optional[str] = FEATURE_CACHE_DIR):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.counters = make_counters()
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _count(self, name: str) -> None:
+        counter = self.counters[name]
+        with counter.get_lock():
+            counter.value += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.npz")
+
+    @contextmanager
+    def bypassed(self):
+        """Run the block as if the cache were empty, e.g. to profile a recording that is already cached"""
+        token = _BYPASS.set(True)
+        try:
+            yield
+        finally:
+            _BYPASS.reset(token)
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[Dict]:
+        if _BYPASS.get():
+            return None
+        features = self._entries.get(key)
+        if features is not None:
+            self._entries.move_to_end(key)
+            self._count("memory_hits")
+            return dict(features)
+
+        if self.disk_dir:
+            features = self._read_disk(key)
+            if features is not None:
+                features = _read_only(features, copy=False)
+                self._remember(key, features)
+                self._count("disk_hits")
+                return dict(features)
+
+        if count_miss:
+            self._count("misses")
+        return None
+
+    def put(self, key: str, features: Dict, pitch_time_step: float, rms_hop_length: int, sample_rate: int) -> None:
+        if _BYPASS.get():
+            return
+        # Copies: the caller keeps (and may change) the arrays it passed in
+        self._remember(key, _read_only(features, copy=True))
+        if self.disk_dir:
+            try:
+                self._write_disk(key, features, pitch_time_step, rms_hop_length, sample_rate)
+            except OSError as e:
+                logger.debug("Could not write feature cache entry %s: %s", key[:12], e)
+
+    def _remember(self, key: str, features: Dict) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = features
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _write_disk(self, key, features, pitch_time_step, rms_hop_length, sample_rate) -> None:
+        # Timestamps are implied by the step sizes, only the series themselves are stored
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".npz.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    summary=np.array(json.dumps({k: features[k] for k in SUMMARY_KEYS + ("profile",) if k in features})),
+                    pitch_time_series=np.asarray(features["pitch_time_series"], dtype=np.float64),
+                    rms_time_series=np.asarray(features["rms_time_series"], dtype=np.float32),
+                    steps=np.array([pitch_time_step, rms_hop_length, sample_rate], dtype=np.float64),
+                )
+            # Atomic rename so concurrent workers never read a half-written entry
+            os.replace(tmp_path, self._disk_path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                features = json.loads(str(data["summary"]))
+                pitch_time_series = data["pitch_time_series"]
+                rms_time_series = data["rms_time_series"]
+                pitch_time_step, rms_hop_length, sample_rate = data["steps"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug("Ignoring unreadable feature cache entry %s: %s", key[:12], e)
+            return None
+
+        rms_frames = np.arange(len(rms_time_series)) * int(rms_hop_length)
+        features.update({
+            "pitch_time_series": pitch_time_series,
+            "pitch_timestamps": np.arange(len(pitch_time_series)) * pitch_time_step,
+            "rms_time_series": rms_time_series,
+            "rms_timestamps": rms_frames / float(sample_rate),
+        })
+        return features
+
+    def stats(self) -> Dict:
+        stats = {name: self.counters[name].value for name in COUNTER_NAMES}
+        lookups = sum(stats.values())
+        stats.update({
+            "hit_rate": round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0,
+            "max_entries": self.max_entries,
+            "disk_tier": bool(self.disk_dir),
+        })
+        return stats
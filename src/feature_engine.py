@@ -0,0 +1,402 @@
+"""
+Acoustic feature extraction used by the API server.
+
+Kept free of any FastAPI/Gemini imports so extraction worker processes only
+pay for librosa and parselmouth. Those two are imported on first use, so the
+server process (which only needs the constants) and CLI scripts that never
+extract don't pay for them at import time.
+
+Uncompressed WAV input is memory-mapped (pcm_wav.py) and stays float32 from
+the file to the pitch tracker and RMS; the results carry NumPy arrays, which
+only become lists when a response is serialized.
+
+Pitch step, RMS framing, resampler quality and pitch engine come from a named
+AnalysisProfile, chosen per request or for the deployment (ANALYSIS_PROFILE).
+"""
+import io
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from feature_cache import FeatureCache, content_key, file_key
+from pcm_wav import open_pcm_wav, to_float32_mono
+from telemetry import stage
+from vad import VAD_ENABLED, active_regions, find_active_frames, peak_amplitude
+from yin_pitch import PERIODS_PER_WINDOW, frame_grid
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+MIN_F0 = 75.0
+MAX_F0 = 500.0
+# Pitch step and RMS framing of the standard analysis profile
+PITCH_TIME_STEP = 0.01
+RMS_FRAME_LENGTH = 2048
+RMS_HOP_LENGTH = 512
+# Praat's default silence threshold for To Pitch
+PRAAT_SILENCE_THRESHOLD = 0.03
+
+# "praat" (parselmouth To Pitch, default) or "yin" (vectorized NumPy tracker in yin_pitch.py)
+PITCH_ENGINE = os.getenv("PITCH_ENGINE", "praat")
+PITCH_ENGINES = ("praat", "yin")
+if PITCH_ENGINE not in PITCH_ENGINES:
+    raise ValueError(f"Unknown PITCH_ENGINE '{PITCH_ENGINE}', expected one of {PITCH_ENGINES}")
+
+@dataclass(frozen=True)
+class AnalysisProfile:
+    """Extraction settings that trade accuracy for speed, selected together by name"""
+    name: str
+    pitch_engine: str
+    pitch_time_step: float
+    rms_frame_length: int
+    rms_hop_length: int
+    # soxr quality of the resampler to SAMPLE_RATE: "QQ", "LQ", "MQ", "HQ" (librosa's default) or "VHQ"
+    resample_quality: str
+
+# Measured speed and accuracy of each profile: ANALYSIS_PROFILES.md
+ANALYSIS_PROFILES = {
+    # Half the pitch and RMS frames and a cheaper resampler. Praat at this step is about as fast
+    # as YIN and much closer to the standard results
+    "realtime": AnalysisProfile("realtime", "praat", 0.02, 2048, 1024, "LQ"),
+    # The original settings; PITCH_ENGINE still picks its pitch engine
+    "standard": AnalysisProfile("standard", PITCH_ENGINE, PITCH_TIME_STEP, RMS_FRAME_LENGTH, RMS_HOP_LENGTH, "HQ"),
+    # Twice the time resolution for pitch and RMS, Praat and the best resampler
+    "precise": AnalysisProfile("precise", "praat", 0.005, 2048, 256, "VHQ"),
+}
+
+# Profile used when a request doesn't name one
+ANALYSIS_PROFILE = os.getenv("ANALYSIS_PROFILE", "standard")
+if ANALYSIS_PROFILE not in ANALYSIS_PROFILES:
+    raise ValueError(f"Unknown ANALYSIS_PROFILE '{ANALYSIS_PROFILE}', expected one of {tuple(ANALYSIS_PROFILES)}")
+
+def get_profile(name: Optional[str] = None) -> AnalysisProfile:
+    """Profile by name, the deployment's ANALYSIS_PROFILE for None; ValueError for unknown names"""
+    profile = ANALYSIS_PROFILES.get(name or ANALYSIS_PROFILE)
+    if profile is None:
+        raise ValueError(f"Unknown analysis profile '{name}', expected one of {tuple(ANALYSIS_PROFILES)}")
+    return profile
+
+# Bump when the extraction code changes in a way that alters its output
+FEATURE_VERSION = 1
+
+# Per-process feature cache (extraction workers share its disk tier and counters)
+FEATURE_CACHE = FeatureCache()
+
+def analysis_params(profile: AnalysisProfile, sr: int = SAMPLE_RATE) -> Dict:
+    """Everything that influences extraction output, used as part of the cache key"""
+    return {
+        "version": FEATURE_VERSION,
+        "profile": profile.name,
+        "sample_rate": sr,
+        "min_f0": MIN_F0,
+        "max_f0": MAX_F0,
+        "pitch_time_step": profile.pitch_time_step,
+        "pitch_engine": profile.pitch_engine,
+        "vad": VAD_ENABLED,
+        "rms_frame_length": profile.rms_frame_length,
+        "rms_hop_length": profile.rms_hop_length,
+        "resample_quality": profile.resample_quality,
+    }
+
+def extract_audio_features(audio_path: str, profile_name: Optional[str] = None,
+                           content_hash: Optional[str] = None) -> Dict:
+    """
+    Extract acoustic features from audio file with the named analysis profile.
+    
+    content_hash is the SHA-256 of the file's bytes when the caller already has
+    it (uploads are hashed while spooled); a repeated file is then answered from
+    the feature cache without being decoded.
+    """
+    try:
+        logger.debug("Extracting features from: %s", audio_path)
+        
+        # Check if file exists and has content
+        if not os.path.exists(audio_path):
+            logger.error("Audio file not found: %s", audio_path)
+            return None
+            
+        if os.path.getsize(audio_path) == 0:
+            logger.error("Audio file is empty: %s", audio_path)
+            return None
+        
+        profile = get_profile(profile_name)
+        key = file_key(content_hash, analysis_params(profile)) if content_hash else None
+        if key:
+            # A miss is counted by the decoded-signal lookup below
+            cached = FEATURE_CACHE.get(key, count_miss=False)
+            if cached is not None:
+                logger.debug("Feature cache hit for file %s", content_hash[:12])
+                return cached
+        
+        from stream_extraction import STREAMING_MIN_SECONDS, compute_features_streaming, recording_seconds
+        if recording_seconds(audio_path) > STREAMING_MIN_SECONDS:
+            features = compute_features_streaming(audio_path, profile)
+        else:
+            with stage("decode"):
+                y = decode_audio(audio_path, profile.resample_quality)
+            features = extract_features_from_signal(y, SAMPLE_RATE, profile)
+        
+        if key:
+            FEATURE_CACHE.put(key, features, profile.pitch_time_step, profile.rms_hop_length, SAMPLE_RATE)
+        return features
+    except Exception as e:
+        import traceback
+        logger.error("Error extracting features: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
+        return None
+
+def decode_audio(source: Union[str, BinaryIO], quality: str = "HQ") -> np.ndarray:
+    """Decode audio once into a mono float32 buffer at SAMPLE_RATE (soxr resampler `quality`)"""
+    if isinstance(source, str):
+        mapped = open_pcm_wav(source)
+        if mapped is not None:
+            return decode_mapped(*mapped, quality)
+    
+    import librosa
+    
+    logger.debug("Decoding audio with librosa...")
+    y, sr = librosa.load(source, sr=SAMPLE_RATE, mono=True, res_type=f"soxr_{quality.lower()}")
+    logger.debug("Audio decoded: %s samples at %sHz", len(y), sr)
+    return y
+
+def decode_mapped(frames: np.ndarray, sample_rate: int, quality: str = "HQ") -> np.ndarray:
+    """Float32 mono at SAMPLE_RATE from memory-mapped WAV frames, sample for sample what librosa.load returns"""
+    y = to_float32_mono(frames)
+    if sample_rate != SAMPLE_RATE:
+        import soxr
+        # librosa.load's default resampler, trimmed/padded to the same length
+        n_samples = int(np.ceil(len(y) * SAMPLE_RATE / sample_rate))
+        y = soxr.resample(y, sample_rate, SAMPLE_RATE, quality=quality)
+        if len(y) != n_samples:
+            y = np.pad(y, (0, n_samples - len(y))) if len(y) < n_samples else y[:n_samples]
+    logger.debug("Audio mapped: %s samples at %sHz (from %s at %sHz)",
+                 len(y), SAMPLE_RATE, frames.dtype, sample_rate)
+    return y
+
+def decode_audio_bytes(content: bytes, filename: str = "upload.wav", quality: str = "HQ") -> np.ndarray:
+    """Decode an in-memory recording, spooling to disk only for formats libsndfile can't read"""
+    mapped = open_pcm_wav(content)
+    if mapped is not None:
+        return decode_mapped(*mapped, quality)
+    
+    try:
+        return decode_audio(io.BytesIO(content), quality)
+    except Exception as e:
+        # Compressed formats (webm, m4a, ...) go through audioread, which needs a real file
+        logger.debug("In-memory decode failed (%s), falling back to a temporary file", e)
+    
+    suffix = os.path.splitext(filename)[1] or ".wav"
+    with tempfile.NamedTemporaryFile(suffix=suffix) as spooled:
+        spooled.write(content)
+        spooled.flush()
+        return decode_audio(spooled.name, quality)
+
+def extract_features_from_signal(y: np.ndarray, sr: int = SAMPLE_RATE,
+                                 profile: Optional[AnalysisProfile] = None) -> Dict:
+    """Extract acoustic features from an already decoded mono buffer, reusing cached results"""
+    profile = profile or get_profile()
+    key = content_key(y, analysis_params(profile, sr))
+    cached = FEATURE_CACHE.get(key)
+    if cached is not None:
+        logger.debug("Feature cache hit: %s", key[:12])
+        return cached
+    
+    features = compute_features(y, sr, profile)
+    FEATURE_CACHE.put(key, features, profile.pitch_time_step, profile.rms_hop_length, sr)
+    return features
+
+def track_pitch(y: np.ndarray, sr: int = SAMPLE_RATE, engine: str = PITCH_ENGINE,
+                reference_peak: Optional[float] = None, time_step: float = PITCH_TIME_STEP) -> np.ndarray:
+    """
+    F0 per time_step frame in Hz, 0 for unvoiced frames.
+    
+    reference_peak is the peak of the whole recording when y is an excerpt of
+    it, so silence is judged the same way as on the full recording.
+    """
+    if engine == "yin":
+        from yin_pitch import yin_pitch
+        return yin_pitch(y, sr, time_step, MIN_F0, MAX_F0, reference_peak=reference_peak)
+    
+    import parselmouth
+    
+    # Praat stores samples as float64, so this is the one place the signal gets a float64 copy
+    sound = parselmouth.Sound(np.asarray(y, dtype=np.float64), sampling_frequency=sr)
+    if reference_peak is None:
+        pitch = sound.to_pitch(time_step=time_step, pitch_floor=MIN_F0, pitch_ceiling=MAX_F0)
+    else:
+        # Same as to_pitch, with the silence threshold rescaled from the excerpt's peak to the recording's
+        local_peak = peak_amplitude(y)
+        if local_peak == 0.0:
+            return np.zeros(frame_grid(len(y), sr, time_step, MIN_F0)[0])
+        silence_threshold = min(1.0, PRAAT_SILENCE_THRESHOLD * reference_peak / local_peak)
+        pitch = sound.to_pitch_ac(time_step=time_step, pitch_floor=MIN_F0, pitch_ceiling=MAX_F0,
+                                  silence_threshold=silence_threshold)
+    return pitch.selected_array['frequency']
+
+def excerpt_span(start: int, end: int, first_time: float, sr: int = SAMPLE_RATE,
+                 time_step: float = PITCH_TIME_STEP) -> Tuple[int, int]:
+    """
+    Sample range [first, last) to analyze for frames start..end-1 of a recording's pitch grid.
+    
+    The excerpt is laid out so that its own pitch frames land on those frames of the full
+    grid. A quarter step of slack keeps Praat's frame count away from a floor() boundary;
+    the excerpt then starts a quarter step earlier so its frames stay centered on the grid.
+    """
+    window = PERIODS_PER_WINDOW / MIN_F0
+    first = int(round((first_time + start * time_step - window / 2 - time_step / 4) * sr))
+    length = int(round((window + (end - start - 0.5) * time_step) * sr))
+    return max(0, first), max(0, first) + length
+
+def track_pitch_frames(y: np.ndarray, offset: int, start: int, end: int, first_time: float, peak: float,
+                       sr: int = SAMPLE_RATE, engine: str = PITCH_ENGINE,
+                       time_step: float = PITCH_TIME_STEP) -> np.ndarray:
+    """
+    Pitch for frames start..end-1 of a recording's grid (first frame at first_time).
+    
+    y holds the recording from sample `offset` on and only has to cover excerpt_span();
+    peak is the whole recording's peak. Returns end - start values.
+    """
+    first, last = excerpt_span(start, end, first_time, sr, time_step)
+    segment = y[first - offset:last - offset]
+    values = track_pitch(segment, sr, engine, reference_peak=peak, time_step=time_step)
+    
+    # Frame times follow Praat's layout for however many frames were actually returned
+    duration = len(segment) / sr
+    segment_first_time = 0.5 * duration - 0.5 * len(values) * time_step + 0.5 * time_step
+    times = first / sr + segment_first_time + np.arange(len(values)) * time_step
+    index = np.rint((times - first_time) / time_step).astype(int)
+    inside = (index >= start) & (index < end)
+    
+    pitch_values = np.zeros(end - start)
+    pitch_values[index[inside] - start] = values[inside]
+    return pitch_values
+
+def track_pitch_active(y: np.ndarray, sr: int = SAMPLE_RATE, engine: str = PITCH_ENGINE,
+                       time_step: float = PITCH_TIME_STEP) -> np.ndarray:
+    """
+    Same output as track_pitch, but only the regions found by the VAD pre-pass
+    are analyzed; every other frame is unvoiced (0).
+    """
+    n_frames, first_time = frame_grid(len(y), sr, time_step, MIN_F0)
+    window = PERIODS_PER_WINDOW / MIN_F0
+    active = find_active_frames(y, sr, n_frames, first_time, time_step, window)
+    regions = active_regions(active)
+    pitch_time_series = np.zeros(n_frames)
+    if not regions:
+        return pitch_time_series
+    
+    peak = peak_amplitude(y)
+    for start, end in regions:
+        pitch_time_series[start:end] = track_pitch_frames(y, 0, start, end, first_time, peak, sr, engine, time_step)
+    
+    logger.debug("VAD: pitch tracked on %s/%s frames in %s regions",
+                 sum(end - start for start, end in regions), n_frames, len(regions))
+    return pitch_time_series
+
+def frame_rms(y: np.ndarray, first: int, n_frames: int, frame_length: int = RMS_FRAME_LENGTH,
+              hop_length: int = RMS_HOP_LENGTH) -> np.ndarray:
+    """
+    RMS of n_frames frames, frame i covering y[first + i * hop_length:][:frame_length],
+    with samples outside y counting as zeros (librosa's centered padding).
+    
+    Built from one sum of squares per hop, so y is never padded or framed into a
+    copy. frame_length must be a multiple of hop_length.
+    """
+    if frame_length % hop_length:
+        raise ValueError(f"RMS frame length {frame_length} is not a multiple of the hop length {hop_length}")
+    hops_per_frame = frame_length // hop_length
+    energy = np.zeros(n_frames - 1 + hops_per_frame)
+    
+    lo, hi = max(first, 0), min(first + len(energy) * hop_length, len(y))
+    if hi > lo:
+        body = y[lo:hi]
+        hop, offset = divmod(lo - first, hop_length)
+        if offset:
+            # Partial first hop
+            head = body[:hop_length - offset]
+            energy[hop] += np.dot(head, head)
+            body = body[len(head):]
+            hop += 1
+        whole = len(body) // hop_length
+        hops = body[:whole * hop_length].reshape(whole, hop_length)
+        energy[hop:hop + whole] = np.einsum("ij,ij->i", hops, hops)
+        tail = body[whole * hop_length:]
+        if len(tail):
+            energy[hop + whole] += np.dot(tail, tail)
+    
+    frame_energy = np.lib.stride_tricks.sliding_window_view(energy, hops_per_frame).sum(axis=1)
+    return np.sqrt(frame_energy / frame_length).astype(np.float32)
+
+def compute_features(y: np.ndarray, sr: int = SAMPLE_RATE, profile: Optional[AnalysisProfile] = None) -> Dict:
+    """Run pitch tracking and RMS on a decoded mono buffer"""
+    profile = profile or get_profile()
+    duration = len(y) / sr
+    logger.debug("Duration: %ss", duration)
+    
+    logger.debug("Extracting pitch (%s profile, %s)...", profile.name, profile.pitch_engine)
+    track = track_pitch_active if VAD_ENABLED else track_pitch
+    with stage("pitch"):
+        pitch_time_series = track(y, sr, profile.pitch_engine, time_step=profile.pitch_time_step)
+    pitch_timestamps = np.arange(len(pitch_time_series)) * profile.pitch_time_step
+    
+    voiced_pitch_values = pitch_time_series[pitch_time_series > 0]
+    total_frames = len(pitch_time_series)
+    voiced_frames = len(voiced_pitch_values)
+    voicing_ratio = voiced_frames / total_frames if total_frames > 0 else 0.0
+
+    if len(voiced_pitch_values) > 0:
+        avg_pitch = float(np.mean(voiced_pitch_values))
+        pitch_variability = float(np.std(voiced_pitch_values))
+    else:
+        avg_pitch = 0.0
+        pitch_variability = 0.0
+    
+    logger.debug("Extracting RMS energy...")
+    # Centered frames like librosa.feature.rms (first frame centered on sample 0)
+    with stage("rms"):
+        rms_time_series = frame_rms(y, -(profile.rms_frame_length // 2), 1 + len(y) // profile.rms_hop_length,
+                                    profile.rms_frame_length, profile.rms_hop_length)
+    rms_timestamps = np.arange(len(rms_time_series)) * profile.rms_hop_length / sr
+    avg_energy = float(np.mean(rms_time_series))
+    
+    logger.debug("Feature extraction completed successfully!")
+    return {
+        "avg_pitch": round(avg_pitch, 2),
+        "pitch_variability": round(pitch_variability, 4),
+        "avg_energy": round(avg_energy, 4),
+        "voicing_ratio": round(voicing_ratio, 4),
+        "duration": round(duration, 2),
+        "profile": profile.name,
+        "pitch_time_series": pitch_time_series,
+        "pitch_timestamps": pitch_timestamps,
+        "rms_time_series": rms_time_series,
+        "rms_timestamps": rms_timestamps,
+    }
+
+
+def warm_up() -> None:
+    """
+    Run the full extraction once on a tiny synthetic clip.
+
+    Praat, soxr and librosa's decoder set themselves up on first use; calling
+    this at worker startup pays that cost before real traffic arrives.
+    """
+    import soundfile as sf
+
+    t = np.arange(int(0.5 * 44100)) / 44100
+    tone = (0.1 * np.sin(2 * np.pi * 220.0 * t)).astype(np.float32)
+    warm_path = os.path.join(tempfile.gettempdir(), f'warmup_{os.getpid()}.wav')
+    try:
+        sf.write(warm_path, tone, 44100)
+        # Bypass the feature cache so warm-ups don't show up as cache misses
+        compute_features(decode_audio(warm_path), SAMPLE_RATE)
+        # Compressed uploads are decoded by librosa, load it now rather than on the first one
+        with open(warm_path, "rb") as f:
+            decode_audio(f)
+    finally:
+        if os.path.exists(warm_path):
+            os.unlink(warm_path)
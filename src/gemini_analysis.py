@@ -0,0 +1,230 @@
+"""
+Gemini risk assessment, kept off the event loop.
+
+Calls go through the async Gemini API behind a semaphore that caps in-flight
+requests, with a hard per-call timeout that falls back to a fast placeholder
+response, so one slow model reply never holds up unrelated uploads. The
+Gemini SDK is imported in a worker thread by load() (the server's warm-up
+calls it), never on the event loop and never inside a timed call.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+from analysis_cache import AnalysisCache, template_hash
+from telemetry import stage
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-preview-05-20")
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+# Seconds, including time spent waiting for a free slot
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "20"))
+
+# Number of recent calls kept for latency percentiles
+LATENCY_WINDOW = 256
+
+PROMPT_TEMPLATE = """
+You are a pediatric speech-language pathology AI assistant analyzing baby babble audio data.
+
+**Base Audio (Normal Reference) Metrics:**
+- Average Pitch: {base[avg_pitch]} Hz
+- Pitch Variability: {base[pitch_variability]}
+- Average Energy: {base[avg_energy]}
+- Voicing Ratio: {base[voicing_ratio]}
+- Duration: {base[duration]}s
+
+**Uploaded Baby Audio Metrics:**
+- Average Pitch: {uploaded[avg_pitch]} Hz
+- Pitch Variability: {uploaded[pitch_variability]}
+- Average Energy: {uploaded[avg_energy]}
+- Voicing Ratio: {uploaded[voicing_ratio]}
+- Duration: {uploaded[duration]}s
+
+Based on these acoustic features, provide a detailed analysis in the following JSON format:
+
+{{
+  "risk_assessment": [
+    {{
+      "condition": "Autism Spectrum Disorder (ASD)",
+      "risk_percentage": <number 0-100>,
+      "status": "<Low Risk|Moderate Risk|High Risk>",
+      "reasoning": "<brief explanation>"
+    }},
+    {{
+      "condition": "Developmental Language Disorder (DLD)",
+      "risk_percentage": <number 0-100>,
+      "status": "<Low Risk|Moderate Risk|High Risk>",
+      "reasoning": "<brief explanation>"
+    }},
+    {{
+      "condition": "Hearing Impairment",
+      "risk_percentage": <number 0-100>,
+      "status": "<Low Risk|Moderate Risk|High Risk>",
+      "reasoning": "<brief explanation>"
+    }}
+  ],
+  "overall_status": "<Normal Development|Monitor Closely|Consult Specialist>",
+  "next_steps": [
+    "<actionable recommendation 1>",
+    "<actionable recommendation 2>",
+    "<actionable recommendation 3>"
+  ],
+  "key_findings": "<brief summary of analysis>"
+}}
+
+Consider:
+- Lower voicing ratio may indicate less vocal engagement
+- Abnormal pitch patterns (too high/low or variable) may signal developmental concerns
+- Energy patterns reflect vocal strength and consistency
+- Compare deviations from baseline to assess risk levels
+
+Respond ONLY with valid JSON, no additional text.
+"""
+
+
+def fallback_analysis(status: str, reason: str) -> Dict:
+    """Placeholder analysis returned when Gemini fails or times out"""
+    return {
+        "risk_assessment": [
+            {"condition": "ASD", "risk_percentage": 0, "status": status, "reasoning": reason},
+            {"condition": "DLD", "risk_percentage": 0, "status": status, "reasoning": reason},
+            {"condition": "Hearing Impairment", "risk_percentage": 0, "status": status, "reasoning": reason}
+        ],
+        "overall_status": "Error",
+        "next_steps": ["Please try uploading again"],
+        "key_findings": f"Error during analysis: {reason}"
+    }
+
+
+def parse_response(result_text: str) -> Dict:
+    result_text = result_text.strip()
+    
+    # Clean up markdown code blocks if present
+    if result_text.startswith("```json"):
+        result_text = result_text[7:]
+    if result_text.startswith("```"):
+        result_text = result_text[3:]
+    if result_text.endswith("```"):
+        result_text = result_text[:-3]
+    
+    return json.loads(result_text.strip())
+
+
+class GeminiAnalyzer:
+    def __init__(self, api_key: Optional[str], model_name: str = GEMINI_MODEL,
+                 max_concurrency: int = GEMINI_MAX_CONCURRENCY, timeout: float = GEMINI_TIMEOUT):
+        self.api_key = api_key
+        self.model_name = model_name
+        self._model = None
+        self._load_lock = asyncio.Lock()
+        self._load_error: Optional[Exception] = None
+        self.cache = AnalysisCache()
+        # Editing the prompt or switching models invalidates cached assessments
+        self.prompt_id = template_hash(PROMPT_TEMPLATE, model_name)
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counts = {"calls": 0, "succeeded": 0, "timeouts": 0, "errors": 0}
+
+    def _create_model(self):
+        # Importing google.generativeai takes ~0.7 s
+        import google.generativeai as genai
+        if self.api_key:
+            genai.configure(api_key=self.api_key)
+        else:
+            # Without a key the SDK looks for default credentials (seconds when it probes the
+            # metadata server) as the first request is sent, so look here instead
+            import google.auth
+            credentials, _ = google.auth.default()
+            genai.configure(credentials=credentials)
+        return genai.GenerativeModel(self.model_name)
+
+    async def load(self):
+        """The Gemini client, created in a worker thread the first time (concurrent callers share it)"""
+        async with self._load_lock:
+            if self._model is None and self._load_error is None:
+                try:
+                    self._model = await asyncio.to_thread(self._create_model)
+                except Exception as e:
+                    # The key and credentials don't change while the server runs, don't probe again
+                    self._load_error = e
+        if self._load_error is not None:
+            raise self._load_error
+        return self._model
+
+    async def _generate(self, prompt: str) -> Dict:
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                response = await self._model.generate_content_async(prompt)
+            finally:
+                self._in_flight -= 1
+        return parse_response(response.text)
+
+    async def analyze(self, uploaded_features: Dict, base_features: Dict, baseline_id: str = "") -> Dict:
+        """Use Gemini to analyze babble patterns and generate risk assessment"""
+        key = self.cache.key(uploaded_features, base_features, baseline_id, self.prompt_id)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug("Analysis cache hit: %s", key[:12])
+            return cached
+        
+        prompt = PROMPT_TEMPLATE.format(uploaded=uploaded_features, base=base_features)
+        
+        self._counts["calls"] += 1
+        try:
+            # Normally done by the warm-up already; kept out of the timeout either way
+            await self.load()
+        except Exception as e:
+            self._counts["errors"] += 1
+            logger.error("Gemini client unavailable: %s", e)
+            return fallback_analysis("Analysis Error", str(e))
+        
+        started = time.perf_counter()
+        try:
+            with stage("gemini"):
+                analysis = await asyncio.wait_for(self._generate(prompt), timeout=self.timeout)
+            self._counts["succeeded"] += 1
+            # Only real answers are memoized, never the timeout/error placeholders
+            self.cache.put(key, analysis)
+            if self.cache.path:
+                await asyncio.to_thread(self.cache.save, self.cache.snapshot())
+            return analysis
+        except asyncio.TimeoutError:
+            self._counts["timeouts"] += 1
+            logger.warning("Gemini analysis timed out after %ss", self.timeout)
+            return fallback_analysis("Analysis Timeout", f"Analysis took longer than {self.timeout:g}s")
+        except Exception as e:
+            self._counts["errors"] += 1
+            logger.error("Gemini analysis error: %s", e)
+            return fallback_analysis("Analysis Error", str(e))
+        finally:
+            latency = time.perf_counter() - started
+            self._latencies.append(latency)
+            logger.debug("Gemini call finished in %.2fs", latency)
+
+    def stats(self) -> Dict:
+        latencies = np.array(self._latencies) if self._latencies else np.zeros(1)
+        return {
+            **self._counts,
+            "cache": self.cache.stats(),
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout,
+            "latency_seconds": {
+                "window": len(self._latencies),
+                "mean": round(float(latencies.mean()), 4),
+                "p50": round(float(np.percentile(latencies, 50)), 4),
+                "p95": round(float(np.percentile(latencies, 95)), 4),
+                "max": round(float(latencies.max()), 4),
+            },
+        }
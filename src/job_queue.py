@@ -0,0 +1,396 @@
+"""
+Asynchronous analysis jobs.
+
+POST /jobs spools the upload, stores a job and answers with its ID right
+away; JOB_WORKERS tasks take jobs from an in-process queue and run them with
+the same pipeline as /upload-base-audio. Every step is recorded as an event
+in the /ws message format ({"type": "status" | "features" | "analysis" |
+"complete" | "error", ...}), so clients can either poll GET /jobs/{id} or
+subscribe to the job on /ws and receive the events as they happen.
+
+Jobs live in a JobStore. MemoryJobStore (the default) forgets them on
+restart; SQLiteJobStore keeps them in a local database file, so finished
+results survive a restart and jobs that were still queued are picked up
+again. Other backends only need the four JobStore methods (add_event has a
+default). Finished jobs are pruned JOB_TTL seconds after they finish, checked
+every JOB_PRUNE_SECONDS and on each submission.
+
+Jobs run in the process that accepted them. With several server processes
+sharing one SQLite file every process can answer polls and subscriptions for
+any job (foreign jobs are followed by polling the store), but only one
+process per file should be restarted at a time, since each resumes all
+unfinished jobs it finds.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# "memory" (default) or "sqlite"
+JOB_STORE = os.getenv("JOB_STORE", "memory")
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "jobs.sqlite3")
+# Jobs processed at the same time (each one holds an extraction worker while it extracts)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Jobs allowed to wait in the queue before submissions are rejected
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", "100"))
+# Finished jobs are kept this many seconds for polling
+JOB_TTL = float(os.getenv("JOB_TTL", "3600"))
+# How often subscriptions to jobs running in another process re-read the store
+JOB_POLL_SECONDS = 0.5
+# How often expired jobs are pruned, even when no new jobs come in
+JOB_PRUNE_SECONDS = 60
+
+QUEUED, RUNNING, COMPLETE, ERROR = "queued", "running", "complete", "error"
+FINISHED = (COMPLETE, ERROR)
+
+
+class QueueFull(Exception):
+    """Raised by submit() when JOB_MAX_QUEUE jobs are already waiting"""
+
+
+@dataclass
+class Job:
+    id: str
+    params: Dict
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    events: List[Dict] = field(default_factory=list)
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def describe(self) -> Dict:
+        """Status without the events and result"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "event_count": len(self.events),
+            "error": self.error,
+        }
+
+
+class JobStore:
+    """Where jobs are kept; save() is called after every change to a job, add_event() for each new event"""
+
+    name = "base"
+    # Whether jobs outlive the process, i.e. unfinished ones are resumed on restart
+    persistent = False
+
+    def save(self, job: Job) -> None:
+        raise NotImplementedError
+
+    def add_event(self, job: Job, event: Dict) -> None:
+        """Record `event`, just appended to job.events (the job's other fields may have changed too)"""
+        self.save(job)
+
+    def load(self, job_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    def unfinished(self) -> List[Job]:
+        """Queued and running jobs, oldest first"""
+        raise NotImplementedError
+
+    def prune(self, finished_before: float) -> int:
+        """Delete jobs that finished before the given time, returns how many"""
+        raise NotImplementedError
+
+
+class MemoryJobStore(JobStore):
+    name = "memory"
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+
+    def save(self, job: Job) -> None:
+        self._jobs[job.id] = job
+
+    def load(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def unfinished(self) -> List[Job]:
+        return sorted((job for job in self._jobs.values() if not job.finished), key=lambda job: job.created_at)
+
+    def prune(self, finished_before: float) -> int:
+        expired = [job.id for job in self._jobs.values() if job.finished and job.updated_at < finished_before]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    A row per job with the job as JSON, and a row per event; readable by
+    every server process sharing the file.
+
+    Events are kept out of the job's JSON, so recording one writes only that
+    event instead of re-serializing the job with all of its earlier events.
+    """
+
+    name = "sqlite"
+    persistent = True
+
+    def __init__(self, path: str = JOB_STORE_PATH):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, job TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, updated_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_events (job_id TEXT NOT NULL, seq INTEGER NOT NULL, "
+            "event TEXT NOT NULL, PRIMARY KEY (job_id, seq))"
+        )
+
+    @contextmanager
+    def _transaction(self):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def save(self, job: Job) -> None:
+        # Everything but the events, which have their own table
+        row = {f.name: getattr(job, f.name) for f in fields(job) if f.name != "events"}
+        self._db.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, created_at, updated_at, job) VALUES (?, ?, ?, ?, ?)",
+            (job.id, job.status, job.created_at, job.updated_at, json.dumps(row)),
+        )
+
+    def add_event(self, job: Job, event: Dict) -> None:
+        with self._transaction():
+            self._db.execute(
+                "INSERT OR REPLACE INTO job_events (job_id, seq, event) VALUES (?, ?, ?)",
+                (job.id, event["seq"], json.dumps(event)),
+            )
+            self.save(job)
+
+    def _job(self, row: tuple) -> Job:
+        job = Job(**json.loads(row[0]))
+        events = self._db.execute("SELECT event FROM job_events WHERE job_id = ? ORDER BY seq", (job.id,)).fetchall()
+        if events:
+            job.events = [json.loads(event) for event, in events]
+        return job
+
+    def load(self, job_id: str) -> Optional[Job]:
+        row = self._db.execute("SELECT job FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def unfinished(self) -> List[Job]:
+        rows = self._db.execute(
+            "SELECT job FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+        ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def prune(self, finished_before: float) -> int:
+        expired = "SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?"
+        with self._transaction():
+            self._db.execute(f"DELETE FROM job_events WHERE job_id IN ({expired})", (*FINISHED, finished_before))
+            cursor = self._db.execute(f"DELETE FROM jobs WHERE id IN ({expired})", (*FINISHED, finished_before))
+        return cursor.rowcount
+
+
+JOB_STORES = {"memory": MemoryJobStore, "sqlite": SQLiteJobStore}
+
+
+def make_job_store(name: str = JOB_STORE) -> JobStore:
+    if name not in JOB_STORES:
+        raise ValueError(f"JOB_STORE must be one of: {', '.join(sorted(JOB_STORES))}")
+    return JOB_STORES[name]()
+
+
+# handler(job, emit) -> result of the "complete" event; emit(type, **payload) records an event
+Emit = Callable[..., Awaitable[None]]
+Handler = Callable[[Job, Emit], Awaitable[Dict]]
+# discard(job) releases what a queued job holds when shutdown() drops it for good
+Discard = Callable[[Job], None]
+
+
+class JobQueue:
+    def __init__(self, handler: Handler, store: Optional[JobStore] = None, workers: int = JOB_WORKERS,
+                 max_queue: int = JOB_MAX_QUEUE, ttl: float = JOB_TTL, discard: Optional[Discard] = None):
+        self.handler = handler
+        self.discard = discard
+        self.store = store or make_job_store()
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.ttl = ttl
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Jobs queued or running in this process, by ID
+        self._active: Dict[str, Job] = {}
+        # Event queues of /ws subscribers, by job ID
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._completed = 0
+        self._failed = 0
+
+    async def start(self) -> None:
+        """Start the workers, re-queueing jobs a previous run of the server left unfinished"""
+        self._queue = asyncio.Queue()
+        for job in self.store.unfinished():
+            job.status = QUEUED
+            self._active[job.id] = job
+            self._queue.put_nowait(job.id)
+        if self._active:
+            logger.debug("Resuming %s unfinished jobs from the %s job store", len(self._active), self.store.name)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._prune_periodically()))
+        logger.debug("Job queue ready: store=%s, workers=%s", self.store.name, self.workers)
+
+    def shutdown(self) -> None:
+        """Stop the workers; running jobs are cancelled, queued ones discarded unless the store keeps them"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self.store.persistent or self.discard is None:
+            return
+        # Running jobs clean up after themselves as they are cancelled
+        for job in list(self._active.values()):
+            if job.status == QUEUED:
+                try:
+                    self.discard(job)
+                except Exception as e:
+                    logger.warning("⚠️ Could not discard queued job %s: %s", job.id, e)
+
+    def submit(self, params: Dict) -> Job:
+        """Store and enqueue a new job, raising QueueFull when too many are waiting"""
+        if self._queue is None:
+            raise RuntimeError("Job queue has not been started")
+        if self._queue.qsize() >= self.max_queue:
+            raise QueueFull(f"Job queue is full ({self._queue.qsize()} jobs waiting)")
+
+        self.store.prune(time.time() - self.ttl)
+        job = Job(id=uuid.uuid4().hex, params=params)
+        self.store.save(job)
+        self._record(job, "status", message="Queued")
+        self._active[job.id] = job
+        self._queue.put_nowait(job.id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._active.get(job_id) or self.store.load(job_id)
+
+    async def events(self, job_id: str, since: int = 0) -> AsyncIterator[Dict]:
+        """Events of a job from index `since` on, following it live until it has finished"""
+        job = self.get(job_id)
+        if job is None:
+            return
+        if job_id not in self._active:
+            # Finished, or running in another server process: follow the store
+            while True:
+                for event in job.events[since:]:
+                    since = event["seq"] + 1
+                    yield event
+                if job.finished:
+                    return
+                await asyncio.sleep(JOB_POLL_SECONDS)
+                job = self.store.load(job_id) or job
+
+        # Registered before the backlog is read, so no event can fall in between
+        live: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(live)
+        try:
+            for event in job.events[since:]:
+                since = event["seq"] + 1
+                yield event
+            while not job.finished or not live.empty():
+                event = await live.get()
+                if event["seq"] >= since:
+                    yield event
+                if event["type"] in FINISHED:
+                    return
+        finally:
+            subscribers = self._subscribers.get(job_id, [])
+            if live in subscribers:
+                subscribers.remove(live)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def stats(self) -> Dict:
+        return {
+            "store": self.store.name,
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": sum(1 for job in self._active.values() if job.status == RUNNING),
+            "max_queue_depth": self.max_queue,
+            "completed": self._completed,
+            "failed": self._failed,
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+        }
+
+    @staticmethod
+    def _event(job: Job, event_type: str, **payload) -> Dict:
+        return {"type": event_type, "job_id": job.id, "seq": len(job.events), **payload}
+
+    def _record(self, job: Job, event_type: str, **payload) -> None:
+        event = self._event(job, event_type, **payload)
+        job.events.append(event)
+        job.updated_at = time.time()
+        self.store.add_event(job, event)
+        for live in self._subscribers.get(job.id, []):
+            live.put_nowait(event)
+
+    async def _prune_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(JOB_PRUNE_SECONDS)
+            try:
+                pruned = self.store.prune(time.time() - self.ttl)
+            except Exception as e:
+                logger.error("Failed to prune expired jobs: %s", e)
+                continue
+            if pruned:
+                logger.debug("Pruned %s expired jobs", pruned)
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._active.get(job_id)
+            if job is None:
+                continue
+
+            job.status = RUNNING
+
+            async def emit(event_type: str, **payload) -> None:
+                self._record(job, event_type, **payload)
+
+            try:
+                await emit("status", message="Processing")
+                result = await self.handler(job, emit)
+                job.status, job.result = COMPLETE, result
+                self._completed += 1
+                self._record(job, "complete", data=result)
+            except asyncio.CancelledError:
+                # Server shutdown: the job stays queued in a persistent store and is resumed on restart
+                # (the handler keeps whatever it needs to run it again)
+                job.status = QUEUED
+                self.store.save(job)
+                raise
+            except Exception as e:
+                logger.error("❌ Job %s failed: %s", job.id, e)
+                job.status, job.error = ERROR, str(e)
+                self._failed += 1
+                self._record(job, "error", message=str(e))
+            finally:
+                if job.finished:
+                    del self._active[job.id]
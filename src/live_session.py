@@ -0,0 +1,253 @@
+"""
+Incremental feature extraction for live monitoring sessions over /ws.
+
+Audio arrives as raw PCM frames. Each LiveSession keeps only a short rolling
+buffer (one block plus analysis context on both sides), runs Praat pitch and
+RMS on each block as soon as it is complete, and folds the results into
+running statistics. Memory stays constant however long the session runs,
+and nothing is re-extracted from scratch at the end.
+
+Praat judges silence relative to the loudest sample of the recording, which
+a live session only knows once it has been heard. Blocks are scored against
+the loudest sample so far, and the last RESCORE_SECONDS of analyzed audio
+are kept: when a louder passage raises the peak, those blocks are scored
+again and the running statistics corrected, so the summary matches the
+offline analysis of the same recording. Points already pushed to the client
+are not revised.
+"""
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+
+import numpy as np
+
+from feature_engine import (
+    SAMPLE_RATE, MIN_F0, MAX_F0, PITCH_TIME_STEP, PRAAT_SILENCE_THRESHOLD, RMS_FRAME_LENGTH, RMS_HOP_LENGTH,
+)
+
+# Audio analyzed per block; a features message is pushed after each block
+LIVE_BLOCK_SECONDS = 0.5
+# Samples of context kept on each side of a block: covers the RMS frame and the Praat pitch window
+CONTEXT_SAMPLES = RMS_FRAME_LENGTH // 2
+# Analyzed audio kept to re-score its pitch when the session's peak rises (about 2 MB at 16 kHz)
+RESCORE_SECONDS = 30.0
+# Kept blocks are re-scored once the peak has grown by this factor since they were last scored
+RESCORE_PEAK_RATIO = 1.05
+
+SAMPLE_FORMATS = {
+    "pcm_s16le": (np.dtype("<i2"), 1.0 / 32768.0),
+    "pcm_f32le": (np.dtype("<f4"), 1.0),
+}
+
+
+class RunningStats:
+    """Streaming equivalent of the summary statistics in extract_audio_features"""
+
+    def __init__(self):
+        self.pitch_frames = 0
+        self.voiced_frames = 0
+        self.pitch_sum = 0.0
+        self.pitch_sumsq = 0.0
+        self.rms_frames = 0
+        self.rms_sum = 0.0
+        self.samples = 0
+
+    def add_pitch(self, pitch_values: np.ndarray) -> None:
+        voiced = pitch_values[pitch_values > 0]
+        self.pitch_frames += len(pitch_values)
+        self.voiced_frames += len(voiced)
+        self.pitch_sum += float(voiced.sum())
+        self.pitch_sumsq += float(np.square(voiced, dtype=np.float64).sum())
+
+    def remove_pitch(self, pitch_values: np.ndarray) -> None:
+        """Take back values added with add_pitch, e.g. before adding their re-scored replacement"""
+        voiced = pitch_values[pitch_values > 0]
+        self.pitch_frames -= len(pitch_values)
+        self.voiced_frames -= len(voiced)
+        self.pitch_sum -= float(voiced.sum())
+        self.pitch_sumsq -= float(np.square(voiced, dtype=np.float64).sum())
+
+    def add_rms(self, rms_values: np.ndarray) -> None:
+        self.rms_frames += len(rms_values)
+        self.rms_sum += float(rms_values.sum(dtype=np.float64))
+
+    def summary(self) -> Dict[str, float]:
+        if self.voiced_frames:
+            avg_pitch = self.pitch_sum / self.voiced_frames
+            variance = max(0.0, self.pitch_sumsq / self.voiced_frames - avg_pitch ** 2)
+            pitch_variability = math.sqrt(variance)
+        else:
+            avg_pitch = 0.0
+            pitch_variability = 0.0
+
+        return {
+            "avg_pitch": round(avg_pitch, 2),
+            "pitch_variability": round(pitch_variability, 4),
+            "avg_energy": round(self.rms_sum / self.rms_frames, 4) if self.rms_frames else 0.0,
+            "voicing_ratio": round(self.voiced_frames / self.pitch_frames, 4) if self.pitch_frames else 0.0,
+            "duration": round(self.samples / SAMPLE_RATE, 2),
+        }
+
+
+@dataclass
+class _ScoredBlock:
+    """An analyzed block kept for re-scoring, with the peak its pitch values were scored against"""
+    segment: np.ndarray
+    times: np.ndarray
+    offset: float
+    local_peak: float
+    peak: float
+    values: np.ndarray
+
+
+class LiveSession:
+    def __init__(self, sample_rate: int = SAMPLE_RATE, sample_format: str = "pcm_s16le",
+                 block_seconds: float = LIVE_BLOCK_SECONDS):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported format '{sample_format}', expected one of {sorted(SAMPLE_FORMATS)}")
+
+        self.dtype, self.scale = SAMPLE_FORMATS[sample_format]
+        self.block = int(block_seconds * SAMPLE_RATE)
+        self.stats = RunningStats()
+
+        self._resampler = None
+        if sample_rate != SAMPLE_RATE:
+            import soxr
+            self._resampler = soxr.ResampleStream(sample_rate, SAMPLE_RATE, 1, dtype="float32")
+
+        # Leading zeros stand in for the audio before the session, like librosa's centered frames
+        self._buffer = np.zeros(CONTEXT_SAMPLES, dtype=np.float32)
+        # Global sample index of the first sample that has not been analyzed yet
+        self._block_start = 0
+        self._pending_bytes = b""
+        self._next_rms_frame = 0
+        self._next_pitch_frame = 0
+        self._peak = 0.0
+        # Most recent analyzed blocks, at most RESCORE_SECONDS of audio
+        self._scored: Deque[_ScoredBlock] = deque()
+        self._scored_samples = 0
+
+    def feed(self, data: bytes) -> None:
+        """Append raw PCM bytes (mono) to the session"""
+        data = self._pending_bytes + data
+        usable = len(data) - len(data) % self.dtype.itemsize
+        self._pending_bytes = data[usable:]
+
+        samples = np.frombuffer(data[:usable], dtype=self.dtype).astype(np.float32) * self.scale
+        if self._resampler is not None:
+            samples = self._resampler.resample_chunk(samples)
+        self.stats.samples += len(samples)
+        self._buffer = np.concatenate([self._buffer, samples])
+
+    def ready(self) -> bool:
+        """True when a full block plus its trailing context is buffered"""
+        return len(self._buffer) >= self.block + 2 * CONTEXT_SAMPLES
+
+    def process_block(self, final: bool = False) -> Optional[Dict]:
+        """Analyze the next block, fold it into the running stats and return the new points"""
+        if final:
+            if self._resampler is not None:
+                tail = self._resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+                self.stats.samples += len(tail)
+                self._buffer = np.concatenate([self._buffer, tail])
+                self._resampler = None
+            remaining = len(self._buffer) - CONTEXT_SAMPLES
+            if remaining <= 0:
+                return None
+            block = min(self.block, remaining)
+            # Zeros after the end of the recording, as in the offline analysis
+            self._buffer = np.concatenate([self._buffer, np.zeros(CONTEXT_SAMPLES, dtype=np.float32)])
+        elif self.ready():
+            block = self.block
+        else:
+            return None
+
+        segment = self._buffer[:block + 2 * CONTEXT_SAMPLES]
+        block_end = self._block_start + block
+
+        pitch_times, pitch_values = self._block_pitch(segment, block)
+        rms_times, rms_values = self._block_rms(segment, block_end, final)
+        self.stats.add_pitch(pitch_values)
+        self.stats.add_rms(rms_values)
+        self._rescore()
+
+        self._buffer = self._buffer[block:]
+        self._block_start = block_end
+        if final:
+            # Drop the zero padding again so a later final call sees only real audio
+            self._buffer = self._buffer[:-CONTEXT_SAMPLES]
+
+        return {
+            "pitch_time_series": pitch_values.tolist(),
+            "pitch_timestamps": pitch_times.tolist(),
+            "rms_time_series": rms_values.tolist(),
+            "rms_timestamps": rms_times.tolist(),
+        }
+
+    def _block_pitch(self, segment: np.ndarray, block: int):
+        """Pitch on the session's PITCH_TIME_STEP grid for grid points inside the block"""
+        offset = (self._block_start - CONTEXT_SAMPLES) / SAMPLE_RATE
+        block_end = (self._block_start + block) / SAMPLE_RATE
+
+        end_frame = max(self._next_pitch_frame, math.ceil(block_end / PITCH_TIME_STEP - 1e-9))
+        times = np.arange(self._next_pitch_frame, end_frame) * PITCH_TIME_STEP
+        self._next_pitch_frame = end_frame
+        if len(times) == 0:
+            return times, np.zeros(0)
+
+        local_peak = float(np.abs(segment).max())
+        self._peak = max(self._peak, local_peak)
+        if local_peak == 0.0:
+            return times, np.zeros(len(times))
+
+        values = self._score(segment, times, offset, local_peak, self._peak)
+        self._scored.append(_ScoredBlock(segment.copy(), times, offset, local_peak, self._peak, values))
+        self._scored_samples += len(segment)
+        while self._scored_samples > RESCORE_SECONDS * SAMPLE_RATE and len(self._scored) > 1:
+            self._scored_samples -= len(self._scored.popleft().segment)
+        return times, values
+
+    def _rescore(self) -> None:
+        """Score kept blocks again against the current peak if it has risen since they were scored"""
+        for scored in self._scored:
+            if self._peak <= scored.peak * RESCORE_PEAK_RATIO:
+                continue
+            values = self._score(scored.segment, scored.times, scored.offset, scored.local_peak, self._peak)
+            self.stats.remove_pitch(scored.values)
+            self.stats.add_pitch(values)
+            scored.values, scored.peak = values, self._peak
+
+    @staticmethod
+    def _score(segment: np.ndarray, times: np.ndarray, offset: float, local_peak: float, peak: float) -> np.ndarray:
+        """Praat pitch for the grid points `times` of a segment starting at `offset` seconds"""
+        # Praat judges silence relative to the loudest sample of the whole Sound; scale its
+        # threshold so the segment is judged against the session's peak instead
+        silence_threshold = min(1.0, PRAAT_SILENCE_THRESHOLD * peak / local_peak)
+
+        import parselmouth
+        sound = parselmouth.Sound(segment.astype(np.float64), sampling_frequency=SAMPLE_RATE)
+        pitch = sound.to_pitch_ac(time_step=PITCH_TIME_STEP, pitch_floor=MIN_F0, pitch_ceiling=MAX_F0,
+                                  silence_threshold=silence_threshold)
+        frequencies = pitch.selected_array['frequency']
+        if len(frequencies) == 0:
+            return np.zeros(len(times))
+
+        # Praat's frames are evenly spaced inside the segment; take the one nearest each grid point
+        first_frame_time = pitch.xs()[0] + offset
+        nearest = np.rint((times - first_frame_time) / PITCH_TIME_STEP).astype(int)
+        return frequencies[np.clip(nearest, 0, len(frequencies) - 1)]
+
+    def _block_rms(self, segment: np.ndarray, block_end: int, final: bool):
+        """Centered RMS frames (RMS_FRAME_LENGTH / RMS_HOP_LENGTH) whose centers fall inside the block"""
+        # librosa's centered framing has frames centered on every hop up to and including the last sample index
+        last_center = block_end if final else block_end - 1
+        first = self._next_rms_frame
+        count = max(0, last_center // RMS_HOP_LENGTH - first + 1)
+        centers = (first + np.arange(count)) * RMS_HOP_LENGTH
+        self._next_rms_frame = first + count
+
+        # Frame centered on c covers [c - CONTEXT_SAMPLES, c + CONTEXT_SAMPLES), i.e. segment[c - block_start:]
+        windows = np.lib.stride_tricks.sliding_window_view(segment, RMS_FRAME_LENGTH)
+        rms = np.sqrt(np.mean(np.square(windows[centers - self._block_start]), axis=1))
+        return centers / SAMPLE_RATE, rms.astype(np.float32)
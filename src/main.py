@@ -1,23 +1,111 @@
+import time
+
+# Import cost is reported in /stats and checked against STARTUP_BUDGET_SECONDS
+IMPORT_STARTED = time.perf_counter()
+
 from dotenv import load_dotenv
 load_dotenv()
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-import numpy as np
-import librosa
-import parselmouth
+from fastapi.responses import FileResponse, JSONResponse, Response
+from contextlib import asynccontextmanager
 import json
+import logging
 import os
+import sys
 import tempfile
-import google.generativeai as genai
-from typing import Dict, List
+from dataclasses import asdict
+from typing import Awaitable, Callable, Dict, List, Optional
 import asyncio
-import requests
 
-app = FastAPI()
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from baseline import BaselineStore
+from blob_manifest import BlobEntry
+from extraction_pool import ExtractionPool, PoolSaturated
+from gemini_analysis import GeminiAnalyzer
+from job_queue import Job, JobQueue, QueueFull
+from feature_engine import (
+    SAMPLE_RATE, ANALYSIS_PROFILE, ANALYSIS_PROFILES, FEATURE_CACHE,
+    extract_audio_features, get_profile,
+)
+from live_session import LIVE_BLOCK_SECONDS, LiveSession
+from request_profiler import (
+    PARTS, RequestProfile, artifact_path, list_profiles, load_summary, profiled_call, profiler_available,
+    valid_profile_id,
+)
+from storage import STORAGE_BACKEND, make_storage
+from series_encoding import DEFAULT_PLOT_POINTS, encode_features, validate_options
+from telemetry import ServerTimingMiddleware, configure_logging, stage
+from upload_spool import (
+    BATCH_MAX_BYTES, MULTIPART_OVERHEAD, UPLOAD_MAX_BYTES,
+    SpooledUpload, UploadLimitMiddleware, UploadRejected, spool_upload,
+)
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+# Seconds from import to answering health checks; worker warm-up and the baseline load run after that
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "2"))
+
+# Background warm-up started by lifespan, requests that need workers or the baseline wait for it
+STARTUP_TASK: Optional[asyncio.Task] = None
+STARTUP = {"import_seconds": round(IMPORT_SECONDS, 3), "serving_seconds": None, "ready_seconds": None}
+
+async def warm_start():
+    """Spawn and warm the extraction workers and the Gemini client, then compute the base.wav features once"""
+    await EXTRACTION_POOL.start()
+    try:
+        await GEMINI.load()
+    except Exception as e:
+        logger.warning("⚠️ Gemini client unavailable, uploads will get placeholder analyses: %s", e)
+    
+    snapshot = await BASELINE.reload(load_base_features)
+    if snapshot:
+        logger.debug("✅ Baseline v%s loaded from: %s", snapshot.version, snapshot.source)
+    else:
+        logger.warning("⚠️ base.wav not found, uploads will proceed without comparison")
+    
+    STARTUP["ready_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 3)
+    logger.debug("Warm start finished %ss after import", STARTUP['ready_seconds'])
+
+async def wait_until_ready():
+    """Block until warm_start has finished (returns immediately once it has)"""
+    if STARTUP_TASK is not None:
+        # Shielded so a cancelled request can't cancel the shared warm-up
+        await asyncio.shield(STARTUP_TASK)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global STARTUP_TASK
+    # Answer health checks right away, heavy warm-up continues in the background
+    STARTUP_TASK = asyncio.create_task(warm_start())
+    await JOBS.start()
+    
+    STARTUP["serving_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 3)
+    logger.debug("Serving %ss after import (imports took %ss)", STARTUP['serving_seconds'], STARTUP['import_seconds'])
+    if STARTUP["serving_seconds"] > STARTUP_BUDGET_SECONDS:
+        logger.warning("⚠️ Startup exceeded its %ss budget", STARTUP_BUDGET_SECONDS)
+    yield
+    STARTUP_TASK.cancel()
+    JOBS.shutdown()
+    EXTRACTION_POOL.shutdown()
+    await STORAGE.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS configuration - supports both local and production
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:5173,http://localhost:5175,http://localhost:3000").split(",")
 
+# Oversized bodies are refused before multipart parsing (added first so CORS still wraps the 413)
+app.add_middleware(UploadLimitMiddleware, limits={
+    "/upload-base-audio": UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD,
+    "/jobs": UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD,
+    "/upload-batch": BATCH_MAX_BYTES,
+})
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -26,425 +114,655 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so its total covers the other middleware too
+app.add_middleware(ServerTimingMiddleware)
+
 # Configure Google Gemini
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')
-
-# Configure Vercel Blob
-BLOB_TOKEN = os.getenv("BLOB_READ_WRITE_TOKEN")
-
-SAMPLE_RATE = 16000
-MIN_F0 = 75.0
-MAX_F0 = 500.0
-
-# Store base audio features (from base.wav analysis)
-BASE_FEATURES = {
-    "avg_pitch": 0.0,
-    "pitch_variability": 0.0,
-    "avg_energy": 0.0,
-    "voicing_ratio": 0.0,
-    "duration": 0.0
-}
-
-# Vercel Blob Storage Helper Functions
-def upload_to_blob(file_content: bytes, filename: str) -> str:
-    """Upload file to Vercel Blob Storage and return the URL"""
-    try:
-        print(f"[DEBUG] Uploading {filename} to Vercel Blob...")
-        
-        headers = {
-            "Authorization": f"Bearer {BLOB_TOKEN}",
-        }
-        
-        # Use Vercel Blob API to upload
-        response = requests.put(
-            f"https://blob.vercel-storage.com/{filename}",
-            headers=headers,
-            data=file_content,
-            params={"filename": filename}
-        )
-        
-        if response.status_code == 200:
-            blob_url = response.json().get("url")
-            print(f"[DEBUG] Successfully uploaded to: {blob_url}")
-            return blob_url
-        else:
-            print(f"[ERROR] Failed to upload to Blob: {response.status_code} - {response.text}")
-            return None
-            
-    except Exception as e:
-        print(f"[ERROR] Error uploading to Blob: {e}")
-        return None
+GEMINI = GeminiAnalyzer(GEMINI_API_KEY)
 
-def download_from_blob(blob_url: str, local_path: str) -> bool:
-    """Download file from Vercel Blob Storage to local path"""
-    try:
-        print(f"[DEBUG] Downloading from Blob: {blob_url}")
-        
-        response = requests.get(blob_url)
-        
-        if response.status_code == 200:
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
-            print(f"[DEBUG] Successfully downloaded to: {local_path}")
-            return True
-        else:
-            print(f"[ERROR] Failed to download from Blob: {response.status_code}")
-            return False
-            
-    except Exception as e:
-        print(f"[ERROR] Error downloading from Blob: {e}")
-        return False
+# Configure storage for recordings and base.wav (Vercel Blob unless STORAGE_BACKEND says otherwise)
+STORAGE = make_storage(STORAGE_BACKEND)
 
-def list_blobs() -> dict:
-    """List all blobs in storage"""
-    try:
-        headers = {
-            "Authorization": f"Bearer {BLOB_TOKEN}",
-        }
-        
-        response = requests.get(
-            "https://blob.vercel-storage.com/",
-            headers=headers
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"[ERROR] Failed to list blobs: {response.status_code}")
-            return {"blobs": []}
-            
-    except Exception as e:
-        print(f"[ERROR] Error listing blobs: {e}")
-        return {"blobs": []}
+# Token required by the /admin endpoints and request profiling (both are disabled when unset)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 
-def extract_audio_features(audio_path: str) -> Dict:
-    """Extract acoustic features from audio file"""
-    try:
-        print(f"[DEBUG] Extracting features from: {audio_path}")
-        print(f"[DEBUG] File exists: {os.path.exists(audio_path)}")
-        print(f"[DEBUG] File size: {os.path.getsize(audio_path) if os.path.exists(audio_path) else 0} bytes")
-        
-        # Check if file exists and has content
-        if not os.path.exists(audio_path):
-            print(f"[ERROR] Audio file not found: {audio_path}")
-            return None
-            
-        if os.path.getsize(audio_path) == 0:
-            print(f"[ERROR] Audio file is empty: {audio_path}")
-            return None
-        
-        print("[DEBUG] Loading audio with parselmouth...")
-        sound = parselmouth.Sound(audio_path)
-        duration = sound.get_total_duration()
-        print(f"[DEBUG] Duration: {duration}s")
-        
-        print("[DEBUG] Extracting pitch...")
-        pitch = sound.to_pitch(time_step=0.01, pitch_floor=MIN_F0, pitch_ceiling=MAX_F0)
-        pitch_time_series = pitch.selected_array['frequency']
-        pitch_interval = pitch.get_time_step()
-        pitch_timestamps = np.arange(len(pitch_time_series)) * pitch_interval
-        
-        voiced_pitch_values = pitch_time_series[pitch_time_series > 0]
-        total_frames = len(pitch_time_series)
-        voiced_frames = len(voiced_pitch_values)
-        voicing_ratio = voiced_frames / total_frames if total_frames > 0 else 0.0
-
-        if len(voiced_pitch_values) > 0:
-            avg_pitch = float(np.mean(voiced_pitch_values))
-            pitch_variability = float(np.std(voiced_pitch_values))
+def require_admin(x_admin_token: Optional[str]) -> None:
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+LOCAL_BASE_PATH = os.path.join(os.path.dirname(__file__), '..', 'audio', 'base.wav')
+# Pathname of the baseline in storage (upload_base_to_blob.py writes it there)
+BASE_BLOB_PATHNAME = "base.wav"
+
+# Current base audio features (from base.wav analysis), swapped atomically on reload
+BASELINE = BaselineStore()
+
+# Feature extraction runs here, never on the event loop
+EXTRACTION_POOL = ExtractionPool()
+
+# Seconds a queued job waits before retrying when every extraction worker is busy
+POOL_RETRY_SECONDS = 1.0
+
+# Most files accepted by one /upload-batch request
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "50"))
+
+# Archive uploads still running after their request returned (kept so they aren't garbage collected)
+ARCHIVE_TASKS = set()
+
+def start_archive_upload(upload: SpooledUpload, filename: str) -> asyncio.Task:
+    """Store a spooled recording in the background, returns the task resolving to its URL"""
+    async def archive() -> Optional[str]:
+        blob_url = await STORAGE.put_file(upload.path, filename)
+        if blob_url:
+            logger.debug("✅ Archived %s to: %s", filename, blob_url)
         else:
-            avg_pitch = 0.0
-            pitch_variability = 0.0
-        
-        print("[DEBUG] Loading audio with librosa...")
-        y, sr = librosa.load(audio_path, sr=SAMPLE_RATE)
-        print(f"[DEBUG] Audio loaded: {len(y)} samples at {sr}Hz")
-        
-        print("[DEBUG] Extracting RMS energy...")
-        rms_data = librosa.feature.rms(y=y, frame_length=2048, hop_length=512)
-        rms_time_series = rms_data[0]
-        rms_timestamps = librosa.frames_to_time(np.arange(len(rms_time_series)), sr=sr, hop_length=512)
-        avg_energy = float(np.mean(rms_time_series))
-        
-        print("[DEBUG] Feature extraction completed successfully!")
-        return {
-            "avg_pitch": round(avg_pitch, 2),
-            "pitch_variability": round(pitch_variability, 4),
-            "avg_energy": round(avg_energy, 4),
-            "voicing_ratio": round(voicing_ratio, 4),
-            "duration": round(duration, 2),
-            "pitch_time_series": pitch_time_series.tolist(),
-            "pitch_timestamps": pitch_timestamps.tolist(),
-            "rms_time_series": rms_time_series.tolist(),
-            "rms_timestamps": rms_timestamps.tolist(),
-        }
-    except Exception as e:
-        import traceback
-        print(f"[ERROR] Error extracting features: {e}")
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+            logger.error("❌ Failed to archive %s to %s storage", filename, STORAGE.name)
+        return blob_url
+    
+    task = asyncio.create_task(archive())
+    ARCHIVE_TASKS.add(task)
+    task.add_done_callback(ARCHIVE_TASKS.discard)
+    return task
+
+async def find_base_blob() -> Optional[BlobEntry]:
+    """Find base.wav in storage (a manifest lookup, no listing)"""
+    logger.debug("Checking %s storage for base.wav...", STORAGE.name)
+    
+    entry = await STORAGE.manifest.get(BASE_BLOB_PATHNAME)
+    if entry is None:
+        # Uploaded with a random suffix (base-<suffix>.wav): take the most recent one
+        stem, extension = os.path.splitext(BASE_BLOB_PATHNAME)
+        candidates = [blob for blob in await STORAGE.manifest.with_prefix(f"{stem}-") if blob.pathname.endswith(extension)]
+        entry = max(candidates, key=lambda blob: blob.uploaded_at or "", default=None)
+    
+    if entry is None:
+        logger.error("❌ base.wav not found in %s storage", STORAGE.name)
+        return None
+    
+    logger.debug("✅ Found base.wav in storage: %s (%s bytes)", entry.url, entry.size)
+    return entry
+
+async def resolve_base_audio() -> Optional[tuple]:
+    """Locate base.wav (local first, then storage), returns (source, local_path)"""
+    # First check if base.wav exists in local audio folder (for local development)
+    if os.path.exists(LOCAL_BASE_PATH):
+        logger.debug("Found local base.wav at: %s", LOCAL_BASE_PATH)
+        return LOCAL_BASE_PATH, LOCAL_BASE_PATH
+    
+    base_blob = await find_base_blob()
+    if not base_blob:
+        return None
+    
+    base_path = os.path.join(tempfile.gettempdir(), f'base_{os.getpid()}.wav')
+    logger.debug("Attempting to download base.wav to: %s", base_path)
+    # With Vercel Blob an unchanged base.wav comes from the local disk cache without a request
+    if not await STORAGE.get(base_blob.url, base_path, etag=base_blob.etag):
+        logger.error("❌ Failed to download base.wav from %s storage", STORAGE.name)
         return None
+    
+    return base_blob.url, base_path
 
-async def analyze_with_gemini(uploaded_features: Dict, base_features: Dict) -> Dict:
-    """Use Gemini to analyze babble patterns and generate risk assessment"""
-    prompt = f"""
-You are a pediatric speech-language pathology AI assistant analyzing baby babble audio data.
-
-**Base Audio (Normal Reference) Metrics:**
-- Average Pitch: {base_features['avg_pitch']} Hz
-- Pitch Variability: {base_features['pitch_variability']}
-- Average Energy: {base_features['avg_energy']}
-- Voicing Ratio: {base_features['voicing_ratio']}
-- Duration: {base_features['duration']}s
-
-**Uploaded Baby Audio Metrics:**
-- Average Pitch: {uploaded_features['avg_pitch']} Hz
-- Pitch Variability: {uploaded_features['pitch_variability']}
-- Average Energy: {uploaded_features['avg_energy']}
-- Voicing Ratio: {uploaded_features['voicing_ratio']}
-- Duration: {uploaded_features['duration']}s
-
-Based on these acoustic features, provide a detailed analysis in the following JSON format:
-
-{{
-  "risk_assessment": [
-    {{
-      "condition": "Autism Spectrum Disorder (ASD)",
-      "risk_percentage": <number 0-100>,
-      "status": "<Low Risk|Moderate Risk|High Risk>",
-      "reasoning": "<brief explanation>"
-    }},
-    {{
-      "condition": "Developmental Language Disorder (DLD)",
-      "risk_percentage": <number 0-100>,
-      "status": "<Low Risk|Moderate Risk|High Risk>",
-      "reasoning": "<brief explanation>"
-    }},
-    {{
-      "condition": "Hearing Impairment",
-      "risk_percentage": <number 0-100>,
-      "status": "<Low Risk|Moderate Risk|High Risk>",
-      "reasoning": "<brief explanation>"
-    }}
-  ],
-  "overall_status": "<Normal Development|Monitor Closely|Consult Specialist>",
-  "next_steps": [
-    "<actionable recommendation 1>",
-    "<actionable recommendation 2>",
-    "<actionable recommendation 3>"
-  ],
-  "key_findings": "<brief summary of analysis>"
-}}
-
-Consider:
-- Lower voicing ratio may indicate less vocal engagement
-- Abnormal pitch patterns (too high/low or variable) may signal developmental concerns
-- Energy patterns reflect vocal strength and consistency
-- Compare deviations from baseline to assess risk levels
-
-Respond ONLY with valid JSON, no additional text.
-"""
+async def load_base_features() -> Optional[tuple]:
+    """Baseline loader for BASELINE.reload, keeps all blocking work off the event loop"""
+    resolved = await resolve_base_audio()
+    if not resolved:
+        return None
     
+    source, base_path = resolved
     try:
-        response = model.generate_content(prompt)
-        result_text = response.text.strip()
-        
-        # Clean up markdown code blocks if present
-        if result_text.startswith("```json"):
-            result_text = result_text[7:]
-        if result_text.startswith("```"):
-            result_text = result_text[3:]
-        if result_text.endswith("```"):
-            result_text = result_text[:-3]
-        
-        result_text = result_text.strip()
-        analysis = json.loads(result_text)
-        return analysis
-    except Exception as e:
-        print(f"Gemini analysis error: {e}")
-        return {
-            "risk_assessment": [
-                {"condition": "ASD", "risk_percentage": 0, "status": "Analysis Error", "reasoning": str(e)},
-                {"condition": "DLD", "risk_percentage": 0, "status": "Analysis Error", "reasoning": str(e)},
-                {"condition": "Hearing Impairment", "risk_percentage": 0, "status": "Analysis Error", "reasoning": str(e)}
-            ],
-            "overall_status": "Error",
-            "next_steps": ["Please try uploading again"],
-            "key_findings": f"Error during analysis: {str(e)}"
-        }
+        base_features = await EXTRACTION_POOL.run(extract_audio_features, base_path)
+    finally:
+        # Only clean up base if it was downloaded from blob (not local)
+        if base_path != LOCAL_BASE_PATH and os.path.exists(base_path):
+            os.unlink(base_path)
+            logger.debug("Cleaned up temporary base file: %s", base_path)
+    
+    if not base_features:
+        logger.error("❌ Failed to extract features from base.wav")
+        return None
+    
+    logger.debug("✅ Base features extracted successfully:")
+    logger.debug("  - avg_pitch: %s Hz", base_features['avg_pitch'])
+    logger.debug("  - pitch_variability: %s", base_features['pitch_variability'])
+    logger.debug("  - avg_energy: %s", base_features['avg_energy'])
+    logger.debug("  - voicing_ratio: %s", base_features['voicing_ratio'])
+    return source, base_features
 
-@app.post("/upload-base-audio")
-async def upload_base_audio(file: UploadFile = File(...)):
-    """Upload and process audio, compare with base reference"""
-    compare_path = None
-    base_path = None
+def render(body: Dict, encoding: str) -> Response:
+    """Serialize a response body as msgpack or JSON (rendered here, so it's timed as serialization)"""
+    with stage("serialize"):
+        if encoding == "msgpack":
+            import msgpack
+            return Response(content=msgpack.packb(body, use_single_float=True), media_type="application/msgpack")
+        return JSONResponse(content=body)
+
+async def analyze_upload(upload: SpooledUpload, profile: str, series_options: Dict,
+                         notify: Optional[Callable[..., Awaitable[None]]] = None,
+                         wait_for_worker: bool = False, capture: Optional[RequestProfile] = None,
+                         keep_on_cancel: bool = False) -> Dict:
+    """
+    Archive, extract and analyze a spooled upload, returning the response body.
     
+    notify(type, **payload) receives status/features/analysis events as each
+    step finishes. PoolSaturated is raised unless wait_for_worker is set, in
+    which case extraction is retried until a worker is free. With a capture,
+    the extraction job is profiled inside the worker too. The spooled file
+    is removed once nothing reads it anymore, unless the call is cancelled
+    with keep_on_cancel set (a job that will be resumed after a restart).
+    """
+    async def step(event_type: str, **payload) -> None:
+        if notify is not None:
+            await notify(event_type, **payload)
+    
+    archive_task = None
+    cancelled = False
     try:
-        print(f"[DEBUG] Received file: {file.filename}, content_type: {file.content_type}")
-        
-        # Read uploaded file content
-        content = await file.read()
-        print(f"[DEBUG] Read {len(content)} bytes from uploaded file")
-        
-        # Upload to Vercel Blob Storage
-        blob_url = upload_to_blob(content, "compare.wav")
-        
-        if not blob_url:
-            return {"status": "error", "message": "Failed to upload audio to cloud storage"}
-        
-        # Download to temporary local file for processing
-        compare_path = os.path.join(tempfile.gettempdir(), f'compare_{os.getpid()}.wav')
+        await wait_until_ready()
         
-        if not download_from_blob(blob_url, compare_path):
-            return {"status": "error", "message": "Failed to download audio from cloud storage"}
+        # Archive to storage while the spooled file is analyzed
+        archive_task = start_archive_upload(upload, "compare.wav")
         
-        print(f"[DEBUG] Downloaded to temporary file: {compare_path}")
-        print(f"[DEBUG] File size: {os.path.getsize(compare_path)} bytes")
-        
-        # Extract features from uploaded file
-        uploaded_features = extract_audio_features(compare_path)
+        # Workers read the spooled file by path, repeated files are served by content hash
+        await step("status", message="Extracting features...")
+        extraction = (extract_audio_features, upload.path, profile, upload.sha256)
+        if capture is not None:
+            extraction = (profiled_call, capture.id, *extraction)
+        while True:
+            try:
+                uploaded_features, memory = await EXTRACTION_POOL.run_measured(*extraction)
+                break
+            except PoolSaturated as e:
+                if not wait_for_worker:
+                    raise
+                logger.warning("⚠️ %s, retrying in %ss", e, POOL_RETRY_SECONDS)
+                await step("status", message="Waiting for a free extraction worker...")
+                await asyncio.sleep(POOL_RETRY_SECONDS)
+        
+        if capture is not None:
+            uploaded_features, capture.worker = uploaded_features
         
         if not uploaded_features:
-            print("[ERROR] Failed to extract features from uploaded audio")
+            logger.error("Failed to extract features from uploaded audio")
             return {"status": "error", "message": "Failed to extract features from uploaded audio"}
         
-        print("[DEBUG] Successfully extracted features from uploaded audio")
+        logger.debug("Successfully extracted features from uploaded audio")
+        with stage("serialize"):
+            encoded_features = encode_features(uploaded_features, **series_options)
+        await step("features", data=encoded_features)
         
-        # Try to load base.wav from Vercel Blob Storage
-        base_features = None
+        # Use the baseline snapshot computed at startup (never re-derived per request)
+        snapshot = BASELINE.current
         analysis = None
         
-        # First check if base.wav exists in local audio folder (for local development)
-        local_base_path = os.path.join(os.path.dirname(__file__), '..', 'audio', 'base.wav')
-        
-        if os.path.exists(local_base_path):
-            print(f"[DEBUG] Found local base.wav at: {local_base_path}")
-            base_path = local_base_path
-        else:
-            # Try to find base.wav in Vercel Blob Storage
-            print("[DEBUG] Checking Vercel Blob Storage for base.wav...")
-            print(f"[DEBUG] BLOB_TOKEN present: {bool(BLOB_TOKEN)}")
-            
-            blobs = list_blobs()
-            print(f"[DEBUG] Found {len(blobs.get('blobs', []))} blobs in storage")
-            
-            base_blob_url = None
+        if snapshot:
+            # Analyze with Gemini
+            logger.debug("🤖 Starting Gemini analysis comparison against baseline v%s...", snapshot.version)
+            logger.debug("Uploaded audio features:")
+            logger.debug("  - avg_pitch: %s Hz", uploaded_features['avg_pitch'])
+            logger.debug("  - pitch_variability: %s", uploaded_features['pitch_variability'])
+            logger.debug("  - avg_energy: %s", uploaded_features['avg_energy'])
+            logger.debug("  - voicing_ratio: %s", uploaded_features['voicing_ratio'])
             
-            for blob in blobs.get("blobs", []):
-                pathname = blob.get("pathname", "")
-                blob_url = blob.get("url", "")
-                print(f"[DEBUG] Checking blob: pathname='{pathname}', url='{blob_url}'")
-                
-                # Check for exact match or ends with base.wav
-                if pathname == "base.wav" or pathname.endswith("/base.wav") or "base" in pathname.lower():
-                    base_blob_url = blob_url
-                    print(f"[DEBUG] ✅ Found base.wav in Blob Storage: {base_blob_url}")
-                    break
-            
-            if base_blob_url:
-                # Download base.wav to temp location
-                base_path = os.path.join(tempfile.gettempdir(), f'base_{os.getpid()}.wav')
-                print(f"[DEBUG] Attempting to download base.wav to: {base_path}")
-                
-                if download_from_blob(base_blob_url, base_path):
-                    print(f"[DEBUG] ✅ Successfully downloaded base.wav to: {base_path}")
-                    print(f"[DEBUG] Downloaded file size: {os.path.getsize(base_path)} bytes")
-                else:
-                    print("[ERROR] ❌ Failed to download base.wav from Blob Storage")
-                    base_path = None
-            else:
-                print("[ERROR] ❌ base.wav not found in Blob Storage")
-        
-        if base_path and os.path.exists(base_path):
-            print(f"[DEBUG] ✅ Loading base audio from: {base_path}")
-            base_features = extract_audio_features(base_path)
+            await step("status", message="Analyzing...")
+            analysis = await GEMINI.analyze(uploaded_features, snapshot.summary, snapshot.fingerprint)
+            logger.debug("✅ Gemini analysis complete!")
+            await step("analysis", data=analysis)
             
-            if base_features:
-                print(f"[DEBUG] ✅ Base features extracted successfully:")
-                print(f"[DEBUG]   - avg_pitch: {base_features['avg_pitch']} Hz")
-                print(f"[DEBUG]   - pitch_variability: {base_features['pitch_variability']}")
-                print(f"[DEBUG]   - avg_energy: {base_features['avg_energy']}")
-                print(f"[DEBUG]   - voicing_ratio: {base_features['voicing_ratio']}")
-                
-                global BASE_FEATURES
-                BASE_FEATURES = {
-                    "avg_pitch": base_features["avg_pitch"],
-                    "pitch_variability": base_features["pitch_variability"],
-                    "avg_energy": base_features["avg_energy"],
-                    "voicing_ratio": base_features["voicing_ratio"],
-                    "duration": base_features["duration"]
-                }
-                
-                # Analyze with Gemini
-                print("[DEBUG] 🤖 Starting Gemini analysis comparison...")
-                print(f"[DEBUG] Uploaded audio features:")
-                print(f"[DEBUG]   - avg_pitch: {uploaded_features['avg_pitch']} Hz")
-                print(f"[DEBUG]   - pitch_variability: {uploaded_features['pitch_variability']}")
-                print(f"[DEBUG]   - avg_energy: {uploaded_features['avg_energy']}")
-                print(f"[DEBUG]   - voicing_ratio: {uploaded_features['voicing_ratio']}")
-                
-                analysis = await analyze_with_gemini(uploaded_features, BASE_FEATURES)
-                print("[DEBUG] ✅ Gemini analysis complete!")
-                
-                if analysis:
-                    print(f"[DEBUG] Analysis result: {analysis.get('overall_status', 'Unknown')}")
-            else:
-                print("[ERROR] ❌ Failed to extract features from base.wav")
+            if analysis:
+                logger.debug("Analysis result: %s", analysis.get('overall_status', 'Unknown'))
         else:
-            print(f"[WARNING] ⚠️ base.wav not found, will proceed without comparison")
-            print(f"[WARNING] Upload a base.wav file to enable risk assessment")
+            logger.warning("⚠️ No baseline loaded, will proceed without comparison")
+            logger.warning("Upload a base.wav file and reload the baseline to enable risk assessment")
+        
+        # The archive upload ran concurrently with extraction and analysis
+        blob_url = await archive_task
         
-        print("[DEBUG] Returning success response")
+        with stage("serialize"):
+            encoded_base = snapshot.encoded(series_options) if snapshot else None
         return {
             "status": "success",
             "message": "Audio processed successfully",
-            "uploaded_features": uploaded_features,
-            "base_features": base_features,
+            "uploaded_features": encoded_features,
+            "base_features": encoded_base,
             "analysis": analysis,
-            "blob_url": blob_url
+            "baseline_version": snapshot.version if snapshot else None,
+            "profile": profile,
+            "blob_url": blob_url,
+            "upload": upload.describe(),
+            "memory": memory,
         }
+    except asyncio.CancelledError:
+        cancelled = True
+        raise
+    finally:
+        if not (cancelled and keep_on_cancel):
+            upload.remove_after(archive_task)
+
+@app.post("/upload-base-audio")
+async def upload_base_audio(
+    file: UploadFile = File(...),
+    points: int = Query(DEFAULT_PLOT_POINTS, description="Points per time series, 0 for full resolution"),
+    downsample: str = Query("lttb", description="lttb or minmax"),
+    encoding: str = Query("json", description="json, base64 (float32) or msgpack"),
+    timestamps: str = Query("explicit", description="explicit arrays, or implicit start/step for series sent at full resolution"),
+    profile: Optional[str] = Query(None, description="realtime, standard or precise (default: ANALYSIS_PROFILE)"),
+    debug_profile: bool = Query(False, description="Profile this request (admins only, see /admin/profiles)"),
+    x_profile_request: bool = Header(False, description="Same as debug_profile"),
+    x_admin_token: Optional[str] = Header(None),
+):
+    """Upload and process audio, compare with base reference"""
+    try:
+        validate_options(downsample, encoding, timestamps)
+        profile = get_profile(profile).name
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    
+    capture = None
+    if debug_profile or x_profile_request:
+        require_admin(x_admin_token)
+        if not profiler_available():
+            return {"status": "error", "message": "Request profiling needs the pyinstrument package"}
+        capture = RequestProfile(file.filename or "upload")
+        capture.start()
+    
+    series_options = {"points": points, "method": downsample, "encoding": encoding, "timestamps": timestamps}
+    try:
+        response = await process_upload(file, profile, series_options, capture)
+    finally:
+        if capture is not None:
+            capture.finish()
+    if capture is not None and isinstance(response, Response):
+        response.headers["X-Profile-Id"] = capture.id
+    return response
+
+async def process_upload(file: UploadFile, profile: str, series_options: Dict,
+                         capture: Optional[RequestProfile] = None):
+    """Spool, analyze and render one /upload-base-audio request"""
+    logger.debug("Received file: %s, content_type: %s", file.filename, file.content_type)
+    try:
+        # Size and format are checked while spooling, before anything is decoded
+        upload = await spool_upload(file, UPLOAD_MAX_BYTES)
+    except UploadRejected as e:
+        logger.warning("⚠️ Rejected upload %s: %s", file.filename, e)
+        return JSONResponse(status_code=e.status_code, content={"status": "error", "message": str(e)})
+    logger.debug("Spooled %s bytes (%s) to %s", upload.size, upload.format, upload.path)
+    
+    try:
+        try:
+            body = await analyze_upload(upload, profile, series_options, capture=capture)
+        except PoolSaturated as e:
+            logger.warning("⚠️ %s", e)
+            return JSONResponse(status_code=503, content={
+                "status": "error",
+                "message": "Server is busy analyzing other recordings, please retry shortly",
+                **e.stats,
+            })
+        
+        if capture is not None:
+            body["profile_capture"] = capture.reference()
+        
+        logger.debug("Returning success response")
+        return render(body, series_options["encoding"])
         
     except Exception as e:
         import traceback
-        print(f"[ERROR] Error in upload endpoint: {e}")
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        logger.error("Error in upload endpoint: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         return {"status": "error", "message": str(e)}
+
+async def run_analysis_job(job: Job, emit) -> Dict:
+    """JobQueue handler: the /upload-base-audio pipeline, reporting each step as a job event"""
+    upload = SpooledUpload(**job.params["upload"])
+    if not os.path.exists(upload.path):
+        raise RuntimeError("The uploaded recording is no longer available, please submit it again")
+    # On shutdown a persistent store re-queues the job, which needs the spooled file after the restart
+    body = await analyze_upload(upload, job.params["profile"], job.params["series_options"],
+                                notify=emit, wait_for_worker=True, keep_on_cancel=JOBS.store.persistent)
+    if body["status"] != "success":
+        raise RuntimeError(body["message"])
+    return body
+
+def discard_analysis_job(job: Job) -> None:
+    """JobQueue discard: a queued job the memory store loses at shutdown won't need its spooled upload"""
+    SpooledUpload(**job.params["upload"]).remove()
+
+JOBS = JobQueue(run_analysis_job, discard=discard_analysis_job)
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    points: int = Query(DEFAULT_PLOT_POINTS, description="Points per time series, 0 for full resolution"),
+    downsample: str = Query("lttb", description="lttb or minmax"),
+    encoding: str = Query("json", description="json or base64 (float32)"),
+    timestamps: str = Query("explicit", description="explicit arrays, or implicit start/step for series sent at full resolution"),
+    profile: Optional[str] = Query(None, description="realtime, standard or precise (default: ANALYSIS_PROFILE)"),
+):
+    """
+    Queue a recording for analysis and return its job ID right away.
+    
+    Follow the job with GET /jobs/{job_id} or by sending
+    {"type": "subscribe", "job_id": ...} on /ws; the complete event carries
+    the same body /upload-base-audio returns.
+    """
+    try:
+        validate_options(downsample, encoding, timestamps)
+        if encoding == "msgpack":
+            raise ValueError("Job results are JSON, use encoding=json or base64")
+        profile = get_profile(profile).name
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    
+    try:
+        upload = await spool_upload(file, UPLOAD_MAX_BYTES)
+    except UploadRejected as e:
+        logger.warning("⚠️ Rejected job upload %s: %s", file.filename, e)
+        return JSONResponse(status_code=e.status_code, content={"status": "error", "message": str(e)})
+    
+    series_options = {"points": points, "method": downsample, "encoding": encoding, "timestamps": timestamps}
+    try:
+        job = JOBS.submit({"upload": asdict(upload), "profile": profile, "series_options": series_options})
+    except QueueFull as e:
+        upload.remove()
+        logger.warning("⚠️ %s", e)
+        return JSONResponse(status_code=503, content={"status": "error", "message": str(e)})
+    
+    logger.debug("Queued job %s for %s (%s bytes)", job.id, file.filename, upload.size)
+    return {"status": "queued", "job_id": job.id, "status_url": f"/jobs/{job.id}"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, since: int = Query(0, ge=0, description="Return events from this index on")):
+    """Poll a job: its status, the events recorded since `since`, and the result once complete"""
+    job = JOBS.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Unknown job {job_id}"})
+    return {**job.describe(), "events": job.events[since:], "result": job.result}
+
+async def process_batch_item(index: int, file: UploadFile, snapshot, slots: asyncio.Semaphore,
+                             series_options: Dict, profile: str) -> Dict:
+    """Extract and analyze one file of a batch, errors are reported in the item instead of raised"""
+    item = {"index": index, "filename": file.filename}
+    try:
+        upload = await spool_upload(file, UPLOAD_MAX_BYTES)
+    except UploadRejected as e:
+        logger.warning("⚠️ Batch item %s: rejected %s: %s", index, file.filename, e)
+        return {**item, "status": "error", "message": str(e)}
+    
+    archive_task = None
+    try:
+        archive_task = start_archive_upload(upload, "compare.wav")
+        
+        # Each batch keeps at most one job per worker in the pool, the rest wait here
+        async with slots:
+            try:
+                features, memory = await EXTRACTION_POOL.run_measured(
+                    extract_audio_features, upload.path, profile, upload.sha256
+                )
+            except PoolSaturated as e:
+                logger.warning("⚠️ Batch item %s: %s", index, e)
+                return {**item, "status": "error", "message": "Server is busy analyzing other recordings, please retry"}
+        
+        if not features:
+            logger.error("Batch item %s: failed to extract features from %s", index, file.filename)
+            return {**item, "status": "error", "message": "Failed to extract features from uploaded audio"}
         
+        analysis = None
+        if snapshot:
+            analysis = await GEMINI.analyze(features, snapshot.summary, snapshot.fingerprint)
+        
+        with stage("serialize"):
+            encoded_features = encode_features(features, **series_options)
+        return {
+            **item,
+            "status": "success",
+            "uploaded_features": encoded_features,
+            "analysis": analysis,
+            "blob_url": await archive_task,
+            "upload": upload.describe(),
+            "memory": memory,
+        }
+    
+    except Exception as e:
+        logger.error("Batch item %s (%s) failed: %s", index, file.filename, e)
+        return {**item, "status": "error", "message": str(e)}
     finally:
-        # Clean up temporary files
-        try:
-            if compare_path and os.path.exists(compare_path):
-                os.unlink(compare_path)
-                print(f"[DEBUG] Cleaned up temporary compare file: {compare_path}")
-            
-            # Only clean up base if it was downloaded from blob (not local)
-            if base_path and base_path.startswith(tempfile.gettempdir()) and os.path.exists(base_path):
-                os.unlink(base_path)
-                print(f"[DEBUG] Cleaned up temporary base file: {base_path}")
-        except Exception as cleanup_error:
-            print(f"[DEBUG] Cleanup warning: {cleanup_error}")
+        upload.remove_after(archive_task)
+
+@app.post("/upload-batch")
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    points: int = Query(DEFAULT_PLOT_POINTS, description="Points per time series, 0 for full resolution"),
+    downsample: str = Query("lttb", description="lttb or minmax"),
+    encoding: str = Query("json", description="json, base64 (float32) or msgpack"),
+    timestamps: str = Query("explicit", description="explicit arrays, or implicit start/step for series sent at full resolution"),
+    profile: Optional[str] = Query(None, description="realtime, standard or precise (default: ANALYSIS_PROFILE)"),
+):
+    """
+    Process many recordings in one request.
+    
+    Files are extracted in parallel on the extraction pool and all compared
+    against the same baseline snapshot. Results come back in request order;
+    a file that fails gets an error entry without failing the batch.
+    """
+    try:
+        validate_options(downsample, encoding, timestamps)
+        profile = get_profile(profile).name
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    
+    if len(files) > BATCH_MAX_FILES:
+        return JSONResponse(status_code=413, content={
+            "status": "error",
+            "message": f"Too many files in one batch ({len(files)}), the limit is {BATCH_MAX_FILES}",
+        })
+    
+    logger.debug("Received batch of %s files", len(files))
+    await wait_until_ready()
+    
+    # One snapshot for the whole batch, even if the baseline is reloaded meanwhile
+    snapshot = BASELINE.current
+    slots = asyncio.Semaphore(EXTRACTION_POOL.workers)
+    series_options = {"points": points, "method": downsample, "encoding": encoding, "timestamps": timestamps}
+    
+    results = await asyncio.gather(*[
+        process_batch_item(index, file, snapshot, slots, series_options, profile) for index, file in enumerate(files)
+    ])
+    succeeded = sum(1 for result in results if result["status"] == "success")
+    logger.debug("Batch complete: %s/%s files processed", succeeded, len(results))
+    
+    with stage("serialize"):
+        encoded_base = snapshot.encoded(series_options) if snapshot else None
+    body = {
+        "status": "success" if succeeded == len(results) else ("partial" if succeeded else "error"),
+        "message": f"Processed {succeeded} of {len(results)} files",
+        "results": results,
+        "base_features": encoded_base,
+        "baseline_version": snapshot.version if snapshot else None,
+        "profile": profile,
+    }
+    return render(body, encoding)
+
+@app.post("/admin/reload-baseline")
+async def reload_baseline(x_admin_token: Optional[str] = Header(None)):
+    """Recompute the baseline snapshot, e.g. after uploading a new base.wav"""
+    require_admin(x_admin_token)
+    
+    await wait_until_ready()
+    if not os.path.exists(LOCAL_BASE_PATH):
+        # base.wav was most likely just uploaded by another process, so don't wait for the manifest's TTL
+        await STORAGE.manifest.refresh()
+    previous = BASELINE.current
+    snapshot = await BASELINE.reload(load_base_features)
+    
+    if not snapshot:
+        return {
+            "status": "error",
+            "message": "Failed to load base.wav, keeping previous baseline",
+            "baseline_version": previous.version if previous else None,
+        }
+    
+    return {
+        "status": "success",
+        "message": "Baseline reloaded",
+        "baseline_version": snapshot.version,
+        "source": snapshot.source,
+        "base_features": snapshot.summary,
+    }
+
+async def send_live_features(websocket: WebSocket, session: LiveSession, final: bool = False):
+    """Analyze every complete block and push a features message for each"""
+    while True:
+        points = await asyncio.to_thread(session.process_block, final)
+        if points is None:
+            return
+        await websocket.send_json({"type": "features", "data": {**session.stats.summary(), **points}})
+
+async def finish_live_session(websocket: WebSocket, session: LiveSession):
+    """Flush the tail of a monitoring session, then send the analysis and the final summary"""
+    await send_live_features(websocket, session, final=True)
+    summary = session.stats.summary()
+    
+    await wait_until_ready()
+    snapshot = BASELINE.current
+    analysis = None
+    if snapshot:
+        await websocket.send_json({"type": "status", "message": "Analyzing session..."})
+        analysis = await GEMINI.analyze(summary, snapshot.summary, snapshot.fingerprint)
+        await websocket.send_json({"type": "analysis", "data": analysis})
+    
+    await websocket.send_json({"type": "complete", "data": {
+        "features": summary,
+        "base_features": snapshot.summary if snapshot else None,
+        "baseline_version": snapshot.version if snapshot else None,
+    }})
+
+@app.get("/admin/profiles")
+async def get_profiles(x_admin_token: Optional[str] = Header(None)):
+    """Summaries of the stored request profiles, newest first"""
+    require_admin(x_admin_token)
+    return {"status": "success", "profiles": list_profiles()}
+
+@app.get("/admin/profiles/{profile_id}")
+async def get_profile_summary(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Timings and tracemalloc peaks of one profiled request, with links to its speedscope files"""
+    require_admin(x_admin_token)
+    summary = load_summary(profile_id) if valid_profile_id(profile_id) else None
+    if summary is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Unknown profile {profile_id}"})
+    return {"status": "success", "profile": summary}
+
+@app.get("/admin/profiles/{profile_id}/{part}")
+async def get_profile_artifact(profile_id: str, part: str, x_admin_token: Optional[str] = Header(None)):
+    """The speedscope JSON of the server or worker side of a profiled request"""
+    require_admin(x_admin_token)
+    path = artifact_path(profile_id, part) if valid_profile_id(profile_id) and part in PARTS else None
+    if path is None or not os.path.exists(path):
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Unknown profile {profile_id}/{part}"})
+    return FileResponse(path, media_type="application/json", filename=os.path.basename(path))
+
+async def forward_job_events(websocket: WebSocket, job_id: str, since: int):
+    """Relay a job's events to a /ws client until the job has finished"""
+    async for event in JOBS.events(job_id, since):
+        await websocket.send_json(event)
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    """
+    Ping/pong, live monitoring sessions and job subscriptions.
+    
+    Send {"type": "start", "sample_rate": 48000, "format": "pcm_s16le", "interval_ms": 500},
+    then binary frames of mono PCM, then {"type": "stop"}. The server pushes a
+    features message every interval_ms of audio, and analysis/complete after stop.
+    
+    Send {"type": "subscribe", "job_id": ..., "since": 0} to receive the events
+    of a job from POST /jobs (each carries its job_id), ending with complete or error.
+    """
     await websocket.accept()
+    session = None
+    subscriptions: Dict[str, asyncio.Task] = {}
     try:
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            
+            if received.get("bytes") is not None:
+                if session is None:
+                    await websocket.send_json({"type": "error", "message": "Send a 'start' message before audio frames"})
+                    continue
+                session.feed(received["bytes"])
+                await send_live_features(websocket, session)
+                continue
+            
+            message = json.loads(received.get("text") or "{}")
             
             if message.get("type") == "ping":
                 await websocket.send_json({"type": "pong"})
+            
+            elif message.get("type") == "start":
+                try:
+                    interval = min(max(int(message.get("interval_ms", LIVE_BLOCK_SECONDS * 1000)), 100), 5000)
+                    session = LiveSession(
+                        sample_rate=int(message.get("sample_rate", SAMPLE_RATE)),
+                        sample_format=message.get("format", "pcm_s16le"),
+                        block_seconds=interval / 1000,
+                    )
+                except (TypeError, ValueError) as e:
+                    await websocket.send_json({"type": "error", "message": str(e)})
+                    continue
+                await websocket.send_json({"type": "status", "message": "Monitoring started"})
+            
+            elif message.get("type") == "stop":
+                if session is None:
+                    await websocket.send_json({"type": "error", "message": "No monitoring session in progress"})
+                    continue
+                await finish_live_session(websocket, session)
+                session = None
+            
+            elif message.get("type") == "subscribe":
+                job_id = str(message.get("job_id", ""))
+                if JOBS.get(job_id) is None:
+                    await websocket.send_json({"type": "error", "job_id": job_id, "message": f"Unknown job {job_id}"})
+                    continue
+                if job_id not in subscriptions or subscriptions[job_id].done():
+                    subscriptions[job_id] = asyncio.create_task(
+                        forward_job_events(websocket, job_id, max(0, int(message.get("since", 0))))
+                    )
                 
     except WebSocketDisconnect:
-        print("Client disconnected")
+        logger.info("Client disconnected")
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
         await websocket.send_json({"type": "error", "message": str(e)})
+    finally:
+        for task in subscriptions.values():
+            task.cancel()
+
+@app.get("/stats")
+async def stats():
+    return {
+        "baseline_version": BASELINE.current.version if BASELINE.current else None,
+        "startup": {**STARTUP, "budget_seconds": STARTUP_BUDGET_SECONDS},
+        "analysis_profile": ANALYSIS_PROFILE,
+        "analysis_profiles": sorted(ANALYSIS_PROFILES),
+        "extraction_pool": EXTRACTION_POOL.stats(),
+        "feature_cache": FEATURE_CACHE.stats(),
+        "gemini": GEMINI.stats(),
+        "jobs": JOBS.stats(),
+        "storage": STORAGE.stats(),
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Stage and request latency histograms in Prometheus text format"""
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+    return Response(content=generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
 
 @app.get("/")
 async def root():
-    return {"message": "Mimicoo Audio Analysis API", "status": "running"}
+    ready = STARTUP_TASK is not None and STARTUP_TASK.done() and not STARTUP_TASK.cancelled() \
+        and STARTUP_TASK.exception() is None
+    return {"message": "Mimicoo Audio Analysis API", "status": "running", "ready": ready}
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,121 @@
+"""
+Zero-copy access to uncompressed WAV recordings.
+
+Decoding through soundfile/librosa allocates a fresh array for every stage of
+the pipeline. For a plain PCM or float WAV the samples already sit after the
+header as a little-endian array, so open_pcm_wav() hands back a NumPy view of
+them instead: np.memmap for a file on disk, np.frombuffer for bytes already
+in memory. to_float32_mono() then makes the one float32 buffer the rest of
+the pipeline works on (or none at all when the file is float32 mono).
+
+Anything else (compressed formats, 8/24-bit PCM, RIFX, malformed headers)
+returns None and the caller falls back to the regular decoder.
+"""
+import io
+import os
+import struct
+from typing import BinaryIO, Optional, Tuple, Union
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# (format, bits per sample) -> sample dtype as stored in the file
+SAMPLE_DTYPES = {
+    (WAVE_FORMAT_PCM, 16): np.dtype("<i2"),
+    (WAVE_FORMAT_PCM, 32): np.dtype("<i4"),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype("<f4"),
+}
+# Integer full scale, matching libsndfile's normalization to [-1, 1)
+FULL_SCALE = {np.dtype("<i2"): 2.0 ** 15, np.dtype("<i4"): 2.0 ** 31}
+
+
+def _read_layout(f: BinaryIO, size: int) -> Optional[Tuple[np.dtype, int, int, int, int]]:
+    """(dtype, channels, sample_rate, data offset, frame count) from a RIFF/WAVE header"""
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+
+    fmt = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, chunk_size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+        start = f.tell()
+
+        if chunk_id == b"fmt ":
+            body = f.read(chunk_size)
+            if len(body) < 16:
+                return None
+            audio_format, channels, sample_rate, _, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+            if audio_format == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                # The actual format is the first two bytes of the SubFormat GUID
+                audio_format = struct.unpack("<H", body[24:26])[0]
+            fmt = (audio_format, channels, sample_rate, block_align, bits)
+
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            audio_format, channels, sample_rate, block_align, bits = fmt
+            dtype = SAMPLE_DTYPES.get((audio_format, bits))
+            if dtype is None or channels < 1 or sample_rate < 1 or block_align != channels * dtype.itemsize:
+                return None
+            # Streamed WAVs may leave the data size at 0 or 0xFFFFFFFF, trust the actual length then
+            available = size - start
+            data_size = chunk_size if 0 < chunk_size <= available else available
+            return dtype, channels, sample_rate, start, data_size // block_align
+
+        # Chunks are word aligned
+        f.seek(start + chunk_size + (chunk_size & 1))
+
+
+def open_pcm_wav(source: Union[str, bytes]) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    (frames, sample_rate) for an uncompressed WAV file path or in-memory WAV bytes.
+
+    frames has shape (n_frames, channels) in the file's sample type and shares
+    memory with the file (read-only memory map) or with the bytes object.
+    Returns None when the recording isn't a WAV this module can map.
+    """
+    try:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            layout = _read_layout(io.BytesIO(source), len(source))
+        else:
+            with open(source, "rb") as f:
+                layout = _read_layout(f, os.fstat(f.fileno()).st_size)
+    except (OSError, struct.error):
+        return None
+    if layout is None:
+        return None
+
+    dtype, channels, sample_rate, offset, n_frames = layout
+    if n_frames == 0:
+        return None
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        frames = np.frombuffer(source, dtype=dtype, count=n_frames * channels, offset=offset)
+        return frames.reshape(n_frames, channels), sample_rate
+    return np.memmap(source, dtype=dtype, mode="r", offset=offset, shape=(n_frames, channels)), sample_rate
+
+
+def to_float32_mono(frames: np.ndarray) -> np.ndarray:
+    """
+    Mono float32 samples in [-1, 1), the same values soundfile + librosa.to_mono produce.
+
+    Float32 mono input is returned as a view; everything else costs exactly one
+    float32 buffer of n_frames samples.
+    """
+    n_frames, channels = frames.shape
+    scale = 1.0 / FULL_SCALE.get(frames.dtype, 1.0)
+
+    if channels == 1:
+        if frames.dtype == np.float32:
+            return frames[:, 0]
+        # Power-of-two scaling in float32 is exact, like libsndfile's conversion
+        return np.multiply(frames[:, 0], np.float32(scale), dtype=np.float32)
+
+    mono = frames.sum(axis=1, dtype=np.float32)
+    mono *= np.float32(scale / channels)
+    return mono
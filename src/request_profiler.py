@@ -0,0 +1,210 @@
+"""
+Opt-in profiling of a single /upload-base-audio request.
+
+An admin sends the request with X-Profile-Request: 1 (or ?debug_profile=1)
+and a valid X-Admin-Token. That one request then runs under pyinstrument's
+sampling profiler in two places:
+
+  server   the request handler in the API process (async aware, so time
+           spent awaiting Blob Storage and Gemini shows up where it's awaited)
+  worker   the extraction job in the pool worker, where Praat and librosa run;
+           the feature cache is bypassed so a known recording is really analyzed
+
+tracemalloc records the peak Python-level allocation on both sides (NumPy
+buffers included, Praat's C++ heap not; the server side also counts whatever
+concurrent requests allocate meanwhile). tracemalloc is process-wide:
+overlapping captures share one trace, stopped when the last of them ends,
+and report its common peak with "tracemalloc_overlapped": true. Both
+profiles are written to
+PROFILE_DIR as speedscope JSON (drop them on https://www.speedscope.app)
+next to a summary, all under one profile ID served by /admin/profiles.
+
+Nothing here is imported or started unless a request asks for it, so the
+cost for every other request is the flag check. pyinstrument is optional;
+without it profiling requests are refused.
+"""
+import importlib.util
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "mimicoo-profiles")
+# Seconds between samples
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+# Most recent profiles kept on disk
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+
+PARTS = ("server", "worker")
+_PROFILE_ID = re.compile(r"^[0-9a-f]{16}$")
+
+# tracemalloc is process-global: samplers in this process share it, the last one to stop stops it
+_TRACEMALLOC_LOCK = threading.Lock()
+_tracemalloc_users = 0
+# Samplers started so far, to tell whether another one overlapped
+_tracemalloc_starts = 0
+# Whether tracing was started here (and not already on, e.g. through PYTHONTRACEMALLOC)
+_tracemalloc_owned = False
+
+
+def profiler_available() -> bool:
+    return importlib.util.find_spec("pyinstrument") is not None
+
+
+def valid_profile_id(profile_id: str) -> bool:
+    return bool(_PROFILE_ID.match(profile_id))
+
+
+def artifact_path(profile_id: str, part: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{profile_id}-{part}.speedscope.json")
+
+
+def summary_path(profile_id: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{profile_id}.json")
+
+
+def _write(path: str, text: str) -> None:
+    """Atomic replace, so a profile is never served half written"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=PROFILE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+class _Sampler:
+    """pyinstrument profiler plus tracemalloc peak over one stretch of work"""
+
+    def __init__(self, async_mode: str = "disabled"):
+        from pyinstrument import Profiler
+        self.profiler = Profiler(interval=PROFILE_INTERVAL, async_mode=async_mode)
+        self._started = 0.0
+        self._shared = False
+        self._starts_before = 0
+
+    def start(self) -> None:
+        import tracemalloc
+        global _tracemalloc_users, _tracemalloc_starts, _tracemalloc_owned
+        with _TRACEMALLOC_LOCK:
+            if _tracemalloc_users == 0:
+                _tracemalloc_owned = not tracemalloc.is_tracing()
+                if _tracemalloc_owned:
+                    tracemalloc.start()
+                else:
+                    tracemalloc.reset_peak()
+            self._shared = _tracemalloc_users > 0
+            _tracemalloc_users += 1
+            _tracemalloc_starts += 1
+            self._starts_before = _tracemalloc_starts
+        self._started = time.perf_counter()
+        self.profiler.start()
+
+    def stop(self, profile_id: str, part: str) -> Dict:
+        """Stop sampling, write the speedscope file and return this part's summary"""
+        import tracemalloc
+        from pyinstrument.renderers import SpeedscopeRenderer
+
+        global _tracemalloc_users
+        self.profiler.stop()
+        wall_seconds = time.perf_counter() - self._started
+        with _TRACEMALLOC_LOCK:
+            _, peak = tracemalloc.get_traced_memory()
+            overlapped = self._shared or _tracemalloc_starts > self._starts_before
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0 and _tracemalloc_owned:
+                tracemalloc.stop()
+
+        _write(artifact_path(profile_id, part), self.profiler.output(SpeedscopeRenderer()))
+        return {
+            "wall_seconds": round(wall_seconds, 4),
+            "tracemalloc_peak_mb": round(peak / 2 ** 20, 2),
+            "tracemalloc_overlapped": overlapped,
+            "artifact": f"/admin/profiles/{profile_id}/{part}",
+        }
+
+
+def profiled_call(profile_id: str, fn: Callable, *args):
+    """Worker side: fn(*args) under the sampler with the feature cache bypassed, returns (result, summary)"""
+    import feature_engine
+
+    sampler = _Sampler()
+    sampler.start()
+    try:
+        with feature_engine.FEATURE_CACHE.bypassed():
+            result = fn(*args)
+    finally:
+        summary = sampler.stop(profile_id, "worker")
+    return result, summary
+
+
+class RequestProfile:
+    """Server side of one profiled request; start() in the request's task, finish() when it's done"""
+
+    def __init__(self, label: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.label = label
+        self.created_at = time.time()
+        # Filled in from profiled_call's result
+        self.worker: Optional[Dict] = None
+        self._sampler = _Sampler(async_mode="enabled")
+
+    def start(self) -> None:
+        self._sampler.start()
+
+    def reference(self) -> Dict:
+        return {"id": self.id, "url": f"/admin/profiles/{self.id}"}
+
+    def finish(self) -> Dict:
+        summary = {
+            "id": self.id,
+            "label": self.label,
+            "created_at": self.created_at,
+            "server": self._sampler.stop(self.id, "server"),
+            "worker": self.worker,
+        }
+        _write(summary_path(self.id), json.dumps(summary))
+        logger.info("Request profile %s written to %s", self.id, PROFILE_DIR)
+        _prune()
+        return summary
+
+
+def load_summary(profile_id: str) -> Optional[Dict]:
+    try:
+        with open(summary_path(profile_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def list_profiles() -> List[Dict]:
+    """Stored profile summaries, newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    summaries = []
+    for name in os.listdir(PROFILE_DIR):
+        profile_id, extension = os.path.splitext(name)
+        if extension == ".json" and valid_profile_id(profile_id):
+            summary = load_summary(profile_id)
+            if summary:
+                summaries.append(summary)
+    return sorted(summaries, key=lambda summary: summary["created_at"], reverse=True)
+
+
+def _prune() -> None:
+    for summary in list_profiles()[PROFILE_KEEP:]:
+        for path in [summary_path(summary["id"])] + [artifact_path(summary["id"], part) for part in PARTS]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,145 @@
+"""
+Compact encodings for the feature time series in API responses.
+
+A few minutes of audio produces tens of thousands of pitch/RMS points, far
+more than any chart can show. encode_features() downsamples each series to
+a client-requested number of points (LTTB or min/max buckets), can replace
+regular timestamp arrays by start/step, and can pack the values as base64
+float32 instead of JSON numbers. Downsampled series are no longer on a
+regular grid, so start/step only replaces the timestamps of series sent at
+full resolution (points=0, or fewer samples than points); with the default
+DEFAULT_PLOT_POINTS anything longer keeps its timestamp array.
+"""
+import base64
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Points per series in the default (plot-sized) response; 0 means full resolution
+DEFAULT_PLOT_POINTS = int(os.getenv("DEFAULT_PLOT_POINTS", "300"))
+MAX_PLOT_POINTS = 20000
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+ENCODINGS = ("json", "base64", "msgpack")
+TIMESTAMP_MODES = ("explicit", "implicit")
+
+# (values key, timestamps key, decimals kept in JSON for values)
+SERIES = (
+    ("pitch_time_series", "pitch_timestamps", 2),
+    ("rms_time_series", "rms_timestamps", 6),
+)
+TIMESTAMP_DECIMALS = 4
+
+
+def lttb(times: np.ndarray, values: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling, keeps the visual shape of the series.
+
+    Every bucket is scored at once: the triangle's first corner is the
+    previous bucket's average instead of its selected point, which removes
+    the bucket-by-bucket loop of the textbook version.
+    """
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return times, values
+
+    # Bucket edges for the n - 2 interior points, first and last points are always kept;
+    # n_out < n makes every bucket at least one point long
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    starts, sizes = edges[:-1], np.diff(edges)
+
+    # One row per bucket, padded to the longest bucket
+    index = starts[:, None] + np.arange(sizes.max())
+    valid = index < (starts + sizes)[:, None]
+    index = np.minimum(index, n - 1)
+    t, v = times[index], values[index]
+    avg_t = np.where(valid, t, 0).sum(axis=1) / sizes
+    avg_v = np.where(valid, v, 0).sum(axis=1) / sizes
+
+    # Corners: the previous bucket's average (the first point for the first bucket)
+    # and the next bucket's average (the last point for the last bucket)
+    prev_t, prev_v = np.r_[times[0], avg_t[:-1]][:, None], np.r_[values[0], avg_v[:-1]][:, None]
+    next_t, next_v = np.r_[avg_t[1:], times[-1]][:, None], np.r_[avg_v[1:], values[-1]][:, None]
+    areas = np.abs((prev_t - next_t) * (v - prev_v) - (prev_t - t) * (next_v - prev_v))
+    areas[~valid] = -1
+
+    selected = np.r_[0, index[np.arange(len(starts)), areas.argmax(axis=1)], n - 1]
+    return times[selected], values[selected]
+
+
+def minmax(times: np.ndarray, values: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the minimum and maximum of each bucket (in time order), preserves peaks exactly"""
+    n = len(values)
+    buckets = n_out // 2
+    if n_out >= n or buckets < 1:
+        return times, values
+
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    selected = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        chunk = values[start:end]
+        lo, hi = start + int(np.argmin(chunk)), start + int(np.argmax(chunk))
+        selected.extend(sorted({lo, hi}))
+    selected = np.array(selected, dtype=int)
+    return times[selected], values[selected]
+
+
+def _pack(array: np.ndarray, encoding: str, decimals: int):
+    if encoding == "base64":
+        return {"dtype": "float32", "base64": base64.b64encode(array.astype("<f4").tobytes()).decode("ascii")}
+    if encoding == "msgpack":
+        # msgpack packs these as single-precision floats
+        return array.astype(np.float32).tolist()
+    return np.round(array, decimals).tolist()
+
+
+def validate_options(method: str, encoding: str, timestamps: str) -> None:
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {DOWNSAMPLE_METHODS}")
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}', expected one of {ENCODINGS}")
+    if timestamps not in TIMESTAMP_MODES:
+        raise ValueError(f"Unknown timestamps mode '{timestamps}', expected one of {TIMESTAMP_MODES}")
+
+
+def encode_features(features: Dict, points: int = DEFAULT_PLOT_POINTS, method: str = "lttb",
+                    encoding: str = "json", timestamps: str = "explicit") -> Dict:
+    """
+    Return a copy of `features` with its time series re-encoded.
+
+    points=0 keeps full resolution. Timestamps are only replaced by
+    <prefix>_time_start/<prefix>_time_step when a series is still on its regular
+    grid (not downsampled) and timestamps="implicit"; a downsampled series
+    always carries its timestamp array, whatever `timestamps` says.
+    """
+    validate_options(method, encoding, timestamps)
+
+    points = min(max(0, points), MAX_PLOT_POINTS)
+    downsample = lttb if method == "lttb" else minmax
+    encoded = dict(features)
+
+    for values_key, times_key, decimals in SERIES:
+        if values_key not in features:
+            continue
+        values = np.asarray(features[values_key], dtype=np.float64)
+        times = np.asarray(features[times_key], dtype=np.float64)
+        total = len(values)
+
+        if points and total > points:
+            times, values = downsample(times, values, points)
+
+        encoded[values_key] = _pack(values, encoding, decimals)
+        encoded[f"{values_key}_points"] = {"returned": len(values), "total": total}
+
+        if timestamps == "implicit" and len(values) == total and total > 1:
+            prefix = times_key[:-len("_timestamps")]
+            del encoded[times_key]
+            encoded[f"{prefix}_time_start"] = float(times[0])
+            encoded[f"{prefix}_time_step"] = float(times[1] - times[0])
+        else:
+            encoded[times_key] = _pack(times, encoding, TIMESTAMP_DECIMALS)
+
+    return encoded
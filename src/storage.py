@@ -0,0 +1,280 @@
+"""
+Pluggable storage for recordings and the baseline.
+
+Everything the server stores (archived uploads, base.wav) goes through a
+StorageBackend, picked with STORAGE_BACKEND:
+
+  vercel      Vercel Blob Storage (default; BlobClient in blob_storage.py)
+  filesystem  files under STORAGE_DIR, for local development and load tests
+              that shouldn't touch the network
+  memory      a dict in the server process, for tests and benchmarks
+
+A backend stores blobs by pathname and hands out a URL for each one; the URL
+is what get() and stream() take, so callers never build paths themselves.
+Listings use the Vercel format ({"pathname", "url", "size", "etag",
+"uploadedAt"}), and every backend keeps a BlobManifest of them for lookups
+by name.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from blob_manifest import BlobManifest
+from telemetry import stage
+
+logger = logging.getLogger(__name__)
+
+# "vercel" (default), "filesystem" or "memory"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "vercel")
+# Root directory of the filesystem backend
+STORAGE_DIR = os.getenv("STORAGE_DIR", "storage")
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _timestamp(seconds: float) -> str:
+    """ISO 8601 in UTC, the format of Vercel's uploadedAt"""
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class StorageBackend:
+    """Where blobs are kept; put and put_file return the stored blob's URL, None on failure"""
+
+    name = "base"
+
+    def __init__(self):
+        self.manifest = BlobManifest(self.list_all)
+
+    async def put(self, pathname: str, content: bytes) -> Optional[str]:
+        raise NotImplementedError
+
+    async def put_file(self, path: str, pathname: str) -> Optional[str]:
+        """Store a file from disk without reading it into memory"""
+        raise NotImplementedError
+
+    async def get(self, url: str, local_path: str, etag: Optional[str] = None) -> bool:
+        """Put the blob at local_path (treat it as read-only, it may be a hard link), False on failure
+
+        `etag` is the blob's current ETag when the caller knows it, letting
+        backends that cache skip the transfer.
+        """
+        raise NotImplementedError
+
+    async def list_all(self) -> List[Dict]:
+        """Every stored blob, raising on failure"""
+        raise NotImplementedError
+
+    def stream(self, url: str) -> AsyncIterator[bytes]:
+        """The blob's content in chunks"""
+        raise NotImplementedError
+
+    async def list(self) -> dict:
+        """{"blobs": [...]}, empty when the listing fails"""
+        try:
+            return {"blobs": await self.list_all()}
+        except Exception as e:
+            logger.error("Error listing blobs: %s", e)
+            return {"blobs": []}
+
+    async def aclose(self) -> None:
+        pass
+
+    def stats(self) -> Dict:
+        return {"backend": self.name, "manifest": self.manifest.stats()}
+
+
+class FilesystemStorage(StorageBackend):
+    """Blobs as files under a root directory, with file:// URLs"""
+
+    name = "filesystem"
+
+    def __init__(self, root: str = STORAGE_DIR):
+        super().__init__()
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, pathname: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, pathname))
+        if os.path.commonpath([self.root, path]) != self.root or path == self.root:
+            raise ValueError(f"Pathname outside of the storage directory: {pathname}")
+        return path
+
+    def _path_from_url(self, url: str) -> str:
+        parsed = urlparse(url)
+        if parsed.scheme != "file":
+            raise ValueError(f"Not a filesystem storage URL: {url}")
+        return self._path(os.path.relpath(url2pathname(parsed.path), self.root))
+
+    def _describe(self, path: str) -> Dict:
+        stat = os.stat(path)
+        return {
+            "pathname": Path(os.path.relpath(path, self.root)).as_posix(),
+            "url": Path(path).as_uri(),
+            "size": stat.st_size,
+            "etag": f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            "uploadedAt": _timestamp(stat.st_mtime),
+        }
+
+    def _write(self, pathname: str, fill) -> Dict:
+        """fill(file) writes the content; it's renamed into place only once complete"""
+        path = self._path(pathname)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                fill(f)
+            # mkstemp creates the file private to this user, stored blobs are ordinary files
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return self._describe(path)
+
+    async def _put(self, pathname: str, fill) -> Optional[str]:
+        with stage("blob_put"):
+            try:
+                blob = await asyncio.to_thread(self._write, pathname, fill)
+            except (OSError, ValueError) as e:
+                logger.error("Error storing %s: %s", pathname, e)
+                return None
+            self.manifest.add(blob)
+            return blob["url"]
+
+    async def put(self, pathname: str, content: bytes) -> Optional[str]:
+        return await self._put(pathname, lambda f: f.write(content))
+
+    async def put_file(self, path: str, pathname: str) -> Optional[str]:
+        def fill(f):
+            with open(path, "rb") as source:
+                shutil.copyfileobj(source, f, STREAM_CHUNK_SIZE)
+        return await self._put(pathname, fill)
+
+    async def get(self, url: str, local_path: str, etag: Optional[str] = None) -> bool:
+        def link():
+            source = self._path_from_url(url)
+            if os.path.exists(local_path):
+                os.unlink(local_path)
+            try:
+                os.link(source, local_path)
+            except OSError:
+                shutil.copyfile(source, local_path)
+
+        with stage("blob_get"):
+            try:
+                await asyncio.to_thread(link)
+                return True
+            except (OSError, ValueError) as e:
+                logger.error("Error reading %s from storage: %s", url, e)
+                return False
+
+    async def list_all(self) -> List[Dict]:
+        def walk() -> List[Dict]:
+            blobs = []
+            for directory, _, names in os.walk(self.root):
+                for name in names:
+                    if name.endswith(".tmp"):
+                        continue
+                    try:
+                        blobs.append(self._describe(os.path.join(directory, name)))
+                    except FileNotFoundError:
+                        # Replaced or deleted while listing
+                        pass
+            return blobs
+
+        with stage("blob_list"):
+            return await asyncio.to_thread(walk)
+
+    async def stream(self, url: str) -> AsyncIterator[bytes]:
+        with open(self._path_from_url(url), "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, STREAM_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    def stats(self) -> Dict:
+        return {**super().stats(), "directory": self.root}
+
+
+class MemoryStorage(StorageBackend):
+    """Blobs in a dict of this process, with memory:// URLs; gone on restart"""
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        # pathname -> (content, listing entry)
+        self._blobs: Dict[str, tuple] = {}
+
+    @staticmethod
+    def _pathname(url: str) -> str:
+        parsed = urlparse(url)
+        if parsed.scheme != "memory":
+            raise ValueError(f"Not a memory storage URL: {url}")
+        return parsed.netloc + parsed.path
+
+    async def put(self, pathname: str, content: bytes) -> Optional[str]:
+        with stage("blob_put"):
+            content = bytes(content)
+            blob = {
+                "pathname": pathname,
+                "url": f"memory://{pathname}",
+                "size": len(content),
+                "etag": f'"{hashlib.sha256(content).hexdigest()[:16]}"',
+                "uploadedAt": _timestamp(datetime.now(timezone.utc).timestamp()),
+            }
+            self._blobs[pathname] = (content, blob)
+            self.manifest.add(blob)
+            return blob["url"]
+
+    async def put_file(self, path: str, pathname: str) -> Optional[str]:
+        try:
+            content = await asyncio.to_thread(Path(path).read_bytes)
+        except OSError as e:
+            logger.error("Error storing %s: %s", pathname, e)
+            return None
+        return await self.put(pathname, content)
+
+    async def get(self, url: str, local_path: str, etag: Optional[str] = None) -> bool:
+        with stage("blob_get"):
+            stored = self._blobs.get(self._pathname(url))
+            if stored is None:
+                logger.error("Blob not found in memory storage: %s", url)
+                return False
+            await asyncio.to_thread(Path(local_path).write_bytes, stored[0])
+            return True
+
+    async def list_all(self) -> List[Dict]:
+        return [dict(blob) for _, blob in self._blobs.values()]
+
+    async def stream(self, url: str) -> AsyncIterator[bytes]:
+        stored = self._blobs.get(self._pathname(url))
+        if stored is None:
+            raise FileNotFoundError(url)
+        content = stored[0]
+        for start in range(0, len(content), STREAM_CHUNK_SIZE):
+            yield content[start:start + STREAM_CHUNK_SIZE]
+
+    def stats(self) -> Dict:
+        return {**super().stats(), "bytes": sum(len(content) for content, _ in self._blobs.values())}
+
+
+def make_storage(name: str = STORAGE_BACKEND) -> StorageBackend:
+    if name == "vercel":
+        # Imported here: BlobClient is itself a StorageBackend
+        from blob_storage import BlobClient
+        return BlobClient(os.getenv("BLOB_READ_WRITE_TOKEN"))
+    if name == "filesystem":
+        return FilesystemStorage()
+    if name == "memory":
+        return MemoryStorage()
+    raise ValueError("STORAGE_BACKEND must be one of: filesystem, memory, vercel")
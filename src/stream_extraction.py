@@ -0,0 +1,229 @@
+"""
+Bounded-memory feature extraction for long recordings.
+
+librosa.load and parselmouth.Sound hold the whole recording as float arrays
+(plus float64 copies), which gets OOM-killed for overnight captures on small
+instances. Here the file is read with soundfile.blocks in fixed windows and
+resampled with a streaming soxr resampler, in two passes:
+
+  1. length, peak and content hash of the 16 kHz signal (needed up front for
+     the pitch frame grid and Praat's silence threshold)
+  2. pitch and RMS for one block of frames at a time, using the frames of the
+     full recording's grid so block boundaries don't shift anything; each
+     block keeps just enough samples on both sides for its analysis windows
+
+Summary statistics are merged exactly from running sums. Only the audio
+buffer is bounded; the per-frame series (100 pitch + ~31 RMS values per
+second) are kept for the response.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import BinaryIO, Dict, Iterator, Optional, Union
+
+import numpy as np
+
+from feature_engine import (
+    SAMPLE_RATE, MIN_F0, FEATURE_CACHE, AnalysisProfile,
+    analysis_params, excerpt_span, frame_rms, get_profile, track_pitch_frames,
+)
+from live_session import RunningStats
+from telemetry import stage
+from vad import VAD_ENABLED, active_regions, find_active_frames, peak_amplitude
+from yin_pitch import PERIODS_PER_WINDOW, frame_grid
+
+logger = logging.getLogger(__name__)
+
+# Recordings longer than this (seconds) are extracted block by block
+STREAMING_MIN_SECONDS = float(os.getenv("STREAMING_MIN_SECONDS", "300"))
+# Seconds of pitch frames analyzed per block
+STREAM_BLOCK_SECONDS = float(os.getenv("STREAM_BLOCK_SECONDS", "30"))
+# Native-rate samples read from the file at a time
+READ_BLOCK_FRAMES = 65536
+
+
+def recording_seconds(source: Union[str, BinaryIO]) -> float:
+    """Duration from the file header, 0 when soundfile can't read the format"""
+    import soundfile as sf
+    try:
+        info = sf.info(source)
+    except Exception:
+        return 0.0
+    finally:
+        if hasattr(source, "seek"):
+            source.seek(0)
+    return info.frames / info.samplerate if info.samplerate else 0.0
+
+
+def iter_resampled(source: Union[str, BinaryIO], quality: str = "HQ") -> Iterator[np.ndarray]:
+    """Mono float32 blocks at SAMPLE_RATE, decoded and resampled incrementally (soxr `quality`)"""
+    import soundfile as sf
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+    native_rate = sf.info(source).samplerate
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    resampler = None
+    if native_rate != SAMPLE_RATE:
+        import soxr
+        # Same filter as the whole-file decoder for the same quality
+        resampler = soxr.ResampleStream(native_rate, SAMPLE_RATE, 1, dtype="float32", quality=quality)
+
+    for block in sf.blocks(source, blocksize=READ_BLOCK_FRAMES, dtype="float32", always_2d=True):
+        # Down-mix like librosa.to_mono; soundfile reuses its block buffer, so always copy
+        mono = block.mean(axis=1, dtype=np.float32) if block.shape[1] > 1 else block[:, 0].copy()
+        if resampler is not None:
+            mono = resampler.resample_chunk(mono)
+        if len(mono):
+            yield mono
+    if resampler is not None:
+        tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+        if len(tail):
+            yield tail
+
+
+def scan(source: Union[str, BinaryIO], profile: AnalysisProfile):
+    """First pass: number of samples, peak amplitude and cache key of the 16 kHz signal"""
+    digest = hashlib.sha256()
+    params = {**analysis_params(profile), "streaming": STREAM_BLOCK_SECONDS}
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    n_samples, peak = 0, 0.0
+    for block in iter_resampled(source, profile.resample_quality):
+        digest.update(memoryview(block).cast("B"))
+        n_samples += len(block)
+        peak = max(peak, peak_amplitude(block))
+    return n_samples, peak, digest.hexdigest()
+
+
+class _SampleWindow:
+    """Rolling buffer of the 16 kHz signal, addressed by absolute sample index"""
+
+    def __init__(self, blocks: Iterator[np.ndarray]):
+        self._blocks = blocks
+        self.start = 0
+        self.samples = np.zeros(0, dtype=np.float32)
+        self.exhausted = False
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.samples)
+
+    def fill(self, until: int) -> None:
+        """Read until the buffer reaches sample `until` (or the end of the recording)"""
+        pending = [self.samples]
+        end = self.end
+        while end < until and not self.exhausted:
+            block = next(self._blocks, None)
+            if block is None:
+                self.exhausted = True
+                break
+            pending.append(block)
+            end += len(block)
+        if len(pending) > 1:
+            self.samples = np.concatenate(pending)
+
+    def drop_before(self, index: int) -> None:
+        if index > self.start:
+            self.samples = self.samples[index - self.start:].copy()
+            self.start = index
+
+    def read(self, first: int, last: int) -> np.ndarray:
+        """Samples [first, last), zero-padded outside the recording"""
+        out = np.zeros(last - first, dtype=np.float32)
+        lo, hi = max(first, self.start), min(last, self.end)
+        if hi > lo:
+            out[lo - first:hi - first] = self.samples[lo - self.start:hi - self.start]
+        return out
+
+
+def _block_rms(window: _SampleWindow, first_frame: int, last_frame: int, profile: AnalysisProfile) -> np.ndarray:
+    """Centered RMS frames first_frame..last_frame-1, zero padded at the edges like librosa"""
+    first = first_frame * profile.rms_hop_length - profile.rms_frame_length // 2
+    return frame_rms(window.samples, first - window.start, last_frame - first_frame,
+                     profile.rms_frame_length, profile.rms_hop_length)
+
+
+def compute_features_streaming(source: Union[str, BinaryIO], profile: Optional[AnalysisProfile] = None) -> Dict:
+    """Same result layout as feature_engine.compute_features, with memory bounded by the block size"""
+    profile = profile or get_profile()
+    time_step, hop_length, frame_length = profile.pitch_time_step, profile.rms_hop_length, profile.rms_frame_length
+    with stage("decode"):
+        n_samples, peak, key = scan(source, profile)
+    cached = FEATURE_CACHE.get(key)
+    if cached is not None:
+        logger.debug("Feature cache hit: %s", key[:12])
+        return cached
+    logger.debug("Streaming extraction: %.1fs in %gs blocks (%s profile)",
+                 n_samples / SAMPLE_RATE, STREAM_BLOCK_SECONDS, profile.name)
+
+    n_frames, first_time = frame_grid(n_samples, SAMPLE_RATE, time_step, MIN_F0)
+    n_rms_frames = 1 + n_samples // hop_length
+    analysis_window = PERIODS_PER_WINDOW / MIN_F0
+    block_frames = max(1, int(STREAM_BLOCK_SECONDS / time_step))
+
+    stats = RunningStats()
+    stats.samples = n_samples
+    pitch_blocks, rms_blocks = [], []
+    window = _SampleWindow(iter_resampled(source, profile.resample_quality))
+    next_rms = 0
+
+    for block_start in range(0, max(n_frames, 1), block_frames):
+        block_end = min(block_start + block_frames, n_frames)
+        if block_end > block_start:
+            first, last = excerpt_span(block_start, block_end, first_time, SAMPLE_RATE, time_step)
+            with stage("decode"):
+                window.fill(last)
+            block = window.read(first, last)
+
+            with stage("pitch"):
+                pitch_values = np.zeros(block_end - block_start)
+                if VAD_ENABLED:
+                    block_first_time = first_time + block_start * time_step - first / SAMPLE_RATE
+                    active = find_active_frames(block, SAMPLE_RATE, block_end - block_start, block_first_time,
+                                                time_step, analysis_window, reference_peak=peak)
+                    regions = active_regions(active)
+                else:
+                    regions = [(0, block_end - block_start)]
+                for start, end in regions:
+                    pitch_values[start:end] = track_pitch_frames(
+                        block, first, block_start + start, block_start + end, first_time, peak, SAMPLE_RATE,
+                        profile.pitch_engine, time_step,
+                    )
+            stats.add_pitch(pitch_values)
+            pitch_blocks.append(pitch_values)
+            # The next block needs samples from its own excerpt start on
+            keep_from = excerpt_span(block_end, block_end + 1, first_time, SAMPLE_RATE, time_step)[0]
+        else:
+            window.fill(n_samples)
+            keep_from = window.end
+
+        # RMS frames whose window ends inside what has been read so far (all of them at the end)
+        last_rms = n_rms_frames if window.exhausted or block_end >= n_frames else \
+            max(next_rms, (window.end - frame_length // 2) // hop_length + 1)
+        last_rms = min(last_rms, n_rms_frames)
+        if last_rms > next_rms:
+            if last_rms == n_rms_frames:
+                window.fill(n_samples)
+            with stage("rms"):
+                rms_values = _block_rms(window, next_rms, last_rms, profile)
+            stats.add_rms(rms_values)
+            rms_blocks.append(rms_values)
+            next_rms = last_rms
+
+        window.drop_before(min(keep_from, next_rms * hop_length - frame_length // 2))
+
+    pitch_time_series = np.concatenate(pitch_blocks) if pitch_blocks else np.zeros(0)
+    rms_time_series = np.concatenate(rms_blocks) if rms_blocks else np.zeros(0, dtype=np.float32)
+    features = {
+        **stats.summary(),
+        "profile": profile.name,
+        "pitch_time_series": pitch_time_series,
+        "pitch_timestamps": np.arange(len(pitch_time_series)) * time_step,
+        "rms_time_series": rms_time_series,
+        "rms_timestamps": np.arange(len(rms_time_series)) * hop_length / SAMPLE_RATE,
+    }
+    FEATURE_CACHE.put(key, features, time_step, hop_length, SAMPLE_RATE)
+    return features
@@ -0,0 +1,139 @@
+"""
+Logging, per-stage latency metrics and Server-Timing headers.
+
+Every expensive step of a request runs inside stage(name). Its duration is
+observed in the mimicoo_stage_duration_seconds histogram (served in
+Prometheus format on /metrics) and added to the current request's timings,
+which ServerTimingMiddleware sends back as a Server-Timing header:
+
+    Server-Timing: upload_read;dur=3.1, extraction;dur=48.0, decode;dur=4.2, pitch;dur=30.5, ...
+
+Extraction runs in worker processes, which can't reach the server's
+registry: the pool runs each job under collect(), ships the worker's timings
+back with the result and the server records them with record().
+
+Diagnostics go through the logging module at LOG_LEVEL (INFO by default),
+so [DEBUG] messages cost a level check instead of formatting a string.
+"""
+import contextvars
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from prometheus_client import Histogram
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Seconds; covers everything from a cache hit to a long Gemini call or a long recording
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = Histogram(
+    "mimicoo_stage_duration_seconds", "Time spent in each processing stage, per request",
+    ["stage"], buckets=LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "mimicoo_request_duration_seconds", "Time until the response headers were sent",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+
+# Stage -> seconds for the request (or extraction job) being handled, None outside of one
+_TIMINGS: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("timings", default=None)
+# False inside collect(): the caller records the timings, observing them here would count them twice
+_OBSERVE: contextvars.ContextVar[bool] = contextvars.ContextVar("observe", default=True)
+
+_METRIC_NAME = re.compile(r"[^A-Za-z0-9_-]")
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class _OwnDebugOnly(logging.Filter):
+    """DEBUG records only from the server's own modules; libraries (multipart, numba, ...) stay at INFO"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.INFO or record.pathname.startswith(SOURCE_DIR)
+
+
+def configure_logging(level: str = LOG_LEVEL) -> None:
+    """Log records as "[LEVEL] message", the format the server has always printed"""
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    handler.addFilter(_OwnDebugOnly())
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, level, logging.INFO))
+    # httpx logs every Blob request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def record(name: str, seconds: float) -> None:
+    """Add `seconds` to stage `name` of the current request and observe it in the histogram"""
+    timings = _TIMINGS.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+    if _OBSERVE.get():
+        STAGE_SECONDS.labels(name).observe(seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+@contextmanager
+def collect() -> Iterator[Dict[str, float]]:
+    """Gather the stages run inside the block into the yielded dict, without observing them"""
+    timings: Dict[str, float] = {}
+    timings_token = _TIMINGS.set(timings)
+    observe_token = _OBSERVE.set(False)
+    try:
+        yield timings
+    finally:
+        _OBSERVE.reset(observe_token)
+        _TIMINGS.reset(timings_token)
+
+
+def server_timing(timings: Dict[str, float], total: float) -> str:
+    entries = [f"{_METRIC_NAME.sub('_', name)};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """Collects the stage timings of every HTTP request into its Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        token = _TIMINGS.set(timings)
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timings, elapsed).encode()))
+                message = {**message, "headers": headers}
+                # The matched route template keeps the label set small (/jobs/{job_id}, not every ID)
+                route = getattr(scope.get("route"), "path", "unmatched")
+                REQUEST_SECONDS.labels(scope["method"], route, str(message["status"])).observe(elapsed)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            _TIMINGS.reset(token)
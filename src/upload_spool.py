@@ -0,0 +1,193 @@
+"""
+Bounded, streamed handling of uploaded recordings.
+
+Starlette parses multipart bodies into a SpooledTemporaryFile (1 MB in
+memory, then disk). spool_upload() copies that into a named file in
+UPLOAD_SPOOL_DIR in UPLOAD_CHUNK_SIZE pieces, hashing as it goes, and gives
+up as soon as the file is over UPLOAD_MAX_BYTES or its first bytes aren't a
+known audio container. Nothing is decoded for a rejected upload, and no
+upload is ever held in memory as a whole. Extraction workers then open the
+spooled file by path (WAVs are memory-mapped straight from it).
+
+UploadLimitMiddleware rejects oversized request bodies before they are
+parsed at all: from Content-Length when the client sends one, otherwise as
+soon as the streamed body passes the limit.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Optional
+
+from telemetry import stage
+
+logger = logging.getLogger(__name__)
+
+# Largest accepted recording (bytes), per file
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(200 * 2 ** 20)))
+# Largest accepted /upload-batch request body (bytes), all files together
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(500 * 2 ** 20)))
+# Where uploads are spooled while they are analyzed (the system temp dir by default)
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or tempfile.gettempdir()
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Room for the multipart boundary and part headers around a single file
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Container -> file suffix, so decoders that go by extension pick the right demuxer
+AUDIO_SUFFIXES = {
+    "wav": ".wav", "flac": ".flac", "ogg": ".ogg", "webm": ".webm",
+    "mp4": ".m4a", "aiff": ".aiff", "caf": ".caf", "mp3": ".mp3",
+}
+
+
+class UploadRejected(Exception):
+    """Raised while spooling an upload that must not be analyzed"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def sniff_audio(head: bytes) -> Optional[str]:
+    """Audio container from the first bytes of a file, None when it isn't one we can decode"""
+    if head[:4] in (b"RIFF", b"RF64") and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+        return "aiff"
+    if head[:4] == b"caff":
+        return "caf"
+    # ID3 tag or a bare MPEG audio frame sync
+    if head[:3] == b"ID3" or (len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+@dataclass(frozen=True)
+class SpooledUpload:
+    path: str
+    filename: str
+    size: int
+    sha256: str
+    format: str
+
+    def remove(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def remove_after(self, task: Optional[asyncio.Task]) -> None:
+        """Delete the spooled file now, or once `task` (still reading it) has finished"""
+        if task is None or task.done():
+            self.remove()
+        else:
+            task.add_done_callback(lambda _: self.remove())
+
+    def describe(self) -> Dict:
+        return {"bytes": self.size, "sha256": self.sha256, "format": self.format}
+
+
+def spool_file(source: BinaryIO, filename: str, max_bytes: int = UPLOAD_MAX_BYTES) -> SpooledUpload:
+    """Copy `source` to a named spool file in chunks, raising UploadRejected as early as possible"""
+    head = source.read(UPLOAD_CHUNK_SIZE)
+    if not head:
+        raise UploadRejected(400, "Empty file")
+    container = sniff_audio(head)
+    if container is None:
+        raise UploadRejected(415, f"{filename} is not a supported audio file "
+                                  f"(expected one of: {', '.join(sorted(AUDIO_SUFFIXES))})")
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="upload_", suffix=AUDIO_SUFFIXES[container], dir=UPLOAD_SPOOL_DIR)
+    try:
+        with os.fdopen(fd, "wb") as spooled:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(413, f"{filename} is larger than the {max_bytes // 2 ** 20} MB upload limit")
+                digest.update(chunk)
+                spooled.write(chunk)
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+    return SpooledUpload(path=path, filename=filename, size=size, sha256=digest.hexdigest(), format=container)
+
+
+async def spool_upload(file, max_bytes: int = UPLOAD_MAX_BYTES) -> SpooledUpload:
+    """spool_file for a FastAPI UploadFile, off the event loop"""
+    with stage("upload_read"):
+        return await asyncio.to_thread(spool_file, file.file, file.filename or "upload.wav", max_bytes)
+
+
+class UploadLimitMiddleware:
+    """Answers 413 for request bodies over the limit configured for their path, before they are parsed"""
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    @staticmethod
+    async def _reject(send, limit: int) -> None:
+        body = json.dumps({
+            "status": "error",
+            "message": f"Request body is larger than the {limit // 2 ** 20} MB limit",
+        }).encode()
+        await send({"type": "http.response.start", "status": 413, "headers": [
+            (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            logger.warning("⚠️ Rejected %s body of %s bytes (limit %s)", scope['path'], int(content_length), limit)
+            await self._reject(send, limit)
+            return
+
+        # No (or a wrong) Content-Length: count the body as it streams in
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request" and not rejected:
+                received += len(message.get("body", b""))
+                if received > limit:
+                    rejected = True
+                    logger.warning("⚠️ Rejected %s body after %s bytes (limit %s)", scope['path'], received, limit)
+                    await self._reject(send, limit)
+                    # The app sees a disconnect and stops parsing
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # The app failing on the cut-off body is expected once the 413 has gone out
+            if not rejected:
+                raise
@@ -0,0 +1,99 @@
+"""
+Energy / zero-crossing voice activity detection in front of pitch tracking.
+
+Infant monitoring recordings are mostly silence, and Praat spends as long on
+a silent second as on a voiced one. find_active_frames() marks the pitch
+frames that could possibly be voiced using two cheap per-hop measurements:
+
+  energy   the frame's peak amplitude relative to the recording's peak. Praat
+           itself scores a frame whose peak is under silence_threshold /
+           (1 + voicing_threshold) ~ 2% of the global peak as unvoiced, so
+           anything below VAD_THRESHOLD can be skipped without changing the
+           result.
+  zcr      the zero-crossing rate. Broadband noise (hiss, rustling) crosses
+           zero far more often than any voiced sound in MIN_F0..MAX_F0, so
+           quiet high-ZCR frames are skipped too.
+
+active_regions() turns the mask into padded, merged frame ranges, which the
+feature engine sends to the pitch tracker one by one before stitching the
+results back into a full-length series with zeros elsewhere.
+"""
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Set VAD_ENABLED=0 to run pitch tracking over the whole recording
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") != "0"
+# Frames whose peak is below this fraction of the recording's peak are silent
+VAD_THRESHOLD = float(os.getenv("VAD_THRESHOLD", "0.02"))
+# Zero crossings per sample above which a quiet frame is treated as noise
+VAD_MAX_ZCR = float(os.getenv("VAD_MAX_ZCR", "0.35"))
+# Frames at least this loud are active whatever their zero-crossing rate
+VAD_LOUD_THRESHOLD = 0.1
+# Frames added before and after every active run (covers Praat's path smoothing)
+VAD_PAD_FRAMES = 5
+# Inactive gaps shorter than this are analyzed anyway; every pitch call has a fixed cost
+VAD_MIN_GAP_FRAMES = 20
+
+
+def peak_amplitude(y: np.ndarray) -> float:
+    """Largest absolute sample value, without allocating np.abs(y)"""
+    return float(max(y.max(), -y.min())) if len(y) else 0.0
+
+
+def find_active_frames(y: np.ndarray, sr: int, n_frames: int, first_time: float,
+                       time_step: float, window: float, reference_peak: Optional[float] = None) -> np.ndarray:
+    """
+    Boolean mask over the pitch frame grid, True where the frame may contain voice.
+
+    first_time is relative to y[0]; reference_peak replaces y's own peak when y
+    is a block of a longer recording.
+    """
+    if n_frames <= 0:
+        return np.zeros(0, dtype=bool)
+    if reference_peak is not None:
+        peak = reference_peak
+    else:
+        peak = peak_amplitude(y)
+    if peak == 0.0:
+        return np.zeros(n_frames, dtype=bool)
+
+    # Per-hop peak and zero crossings, then aggregated over each frame's analysis window
+    hop = max(1, int(round(time_step * sr)))
+    n_hops = len(y) // hop
+    hops = y[:n_hops * hop].reshape(n_hops, hop)
+    hop_peak = np.maximum(hops.max(axis=1), -hops.min(axis=1))
+    signs = np.signbit(y[:n_hops * hop])
+    crossings = np.concatenate([[False], signs[1:] != signs[:-1]]).reshape(n_hops, hop).sum(axis=1)
+
+    # Hops covered by the window of frame j, centered on first_time + j * time_step
+    centers = first_time + np.arange(n_frames) * time_step
+    first_hop = np.clip(np.floor((centers - window / 2) * sr / hop).astype(int), 0, n_hops - 1)
+    span = int(np.ceil(window * sr / hop)) + 1
+    index = np.clip(first_hop[:, None] + np.arange(span), 0, n_hops - 1)
+
+    frame_peak = hop_peak[index].max(axis=1)
+    frame_zcr = crossings[index].sum(axis=1) / (span * hop)
+
+    loud_enough = frame_peak >= VAD_THRESHOLD * peak
+    not_noise = (frame_zcr <= VAD_MAX_ZCR) | (frame_peak >= VAD_LOUD_THRESHOLD * peak)
+    return loud_enough & not_noise
+
+
+def active_regions(active: np.ndarray, pad: int = VAD_PAD_FRAMES,
+                   min_gap: int = VAD_MIN_GAP_FRAMES) -> List[Tuple[int, int]]:
+    """[start, end) frame ranges covering the active frames, padded and with short gaps merged"""
+    if not active.any():
+        return []
+    padded = np.concatenate([[False], active, [False]]).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    starts, ends = edges[0::2], edges[1::2]
+
+    regions = []
+    for start, end in zip(np.maximum(starts - pad, 0), np.minimum(ends + pad, len(active))):
+        if regions and start - regions[-1][1] < min_gap:
+            regions[-1] = (regions[-1][0], int(end))
+        else:
+            regions.append((int(start), int(end)))
+    return regions
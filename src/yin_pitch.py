@@ -0,0 +1,118 @@
+"""
+Pure-NumPy YIN pitch tracker, a fast alternative to Praat's Sound: To Pitch.
+
+All frames of a clip (and all clips of a batch, when they have the same
+length) are analyzed in one set of array operations: framing is a strided
+view, the difference function comes from one batched FFT, and the dip
+picking is a masked argmax over the lag axis.
+
+The output follows Praat's conventions so the summary statistics don't care
+which engine produced them: one value per frame on Praat's frame grid for
+the same time step, and 0 for unvoiced frames.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    # Same API; scipy (already installed for librosa) keeps float32 input in single precision
+    from scipy import fft as _fft
+except ImportError:  # pragma: no cover
+    _fft = np.fft
+
+# Dip of the cumulative mean normalized difference below which a frame is voiced
+YIN_THRESHOLD = 0.2
+# Frames whose peak is below this fraction of the clip's peak are silent (Praat's silence threshold)
+SILENCE_THRESHOLD = 0.03
+# Praat's "periods per window" for the autocorrelation method, decides the frame grid
+PERIODS_PER_WINDOW = 3.0
+
+
+def frame_grid(n_samples: int, sr: int, time_step: float, min_f0: float) -> Tuple[int, float]:
+    """Number of frames and time of the first frame, as Praat lays them out for To Pitch"""
+    duration = n_samples / sr
+    window = PERIODS_PER_WINDOW / min_f0
+    n_frames = int(np.floor((duration - window) / time_step)) + 1 if duration >= window else 0
+    first_time = 0.5 * duration - 0.5 * n_frames * time_step + 0.5 * time_step
+    return n_frames, first_time
+
+
+def yin_pitch(y: np.ndarray, sr: int, time_step: float, min_f0: float, max_f0: float,
+              threshold: float = YIN_THRESHOLD, reference_peak: Optional[float] = None) -> np.ndarray:
+    """
+    F0 per frame in Hz (0 = unvoiced) for a clip of shape (n_samples,) or a
+    batch of equal-length clips of shape (n_clips, n_samples).
+
+    reference_peak replaces the clip's own peak in the silence test, for
+    clips that are excerpts of a longer recording.
+    """
+    signals = np.atleast_2d(np.asarray(y, dtype=np.float32))
+    n_clips, n_samples = signals.shape
+    n_frames, first_time = frame_grid(n_samples, sr, time_step, min_f0)
+    if n_frames <= 0:
+        return np.zeros((n_clips, 0)) if np.ndim(y) == 2 else np.zeros(0)
+
+    tau_min = max(2, int(np.floor(sr / max_f0)))
+    tau_max = int(np.ceil(sr / min_f0))
+    # Integration window of one longest period, plus room to shift it by every lag
+    window = tau_max
+    frame_length = window + tau_max + 1
+
+    # Frame starts on Praat's grid (sample i sits at time (i + 0.5) / sr), frames centered on them
+    centers = np.rint((first_time + np.arange(n_frames) * time_step) * sr - 0.5).astype(np.int64)
+    starts = centers - frame_length // 2
+    pad_left = max(0, -int(starts[0]))
+    pad_right = max(0, int(starts[-1]) + frame_length - n_samples)
+    padded = np.pad(signals, ((0, 0), (pad_left, pad_right)))
+    hop = int(round(time_step * sr))
+    first = int(starts[0]) + pad_left
+
+    if hop > 0 and np.all(np.diff(starts) == hop):
+        # Evenly spaced frames: a strided view, no copy
+        frames = np.lib.stride_tricks.sliding_window_view(padded, frame_length, axis=1)[:, first::hop][:, :n_frames]
+    else:
+        frames = padded[:, (starts + pad_left)[:, None] + np.arange(frame_length)]
+
+    # Difference function d(tau) = e(0) + e(tau) - 2 r(tau) via one FFT cross-correlation.
+    # Only lags 0..tau_max are needed, which never wrap around once n_fft >= frame_length
+    n_fft = 1 << int(np.ceil(np.log2(frame_length)))
+    spectrum = _fft.rfft(frames, n_fft, axis=-1)
+    head = _fft.rfft(frames[..., :window], n_fft, axis=-1)
+    r = _fft.irfft(np.conj(head) * spectrum, n_fft, axis=-1)[..., :tau_max + 1]
+
+    energy = np.cumsum(np.square(frames, dtype=np.float64), axis=-1)
+    energy = np.concatenate([np.zeros(energy.shape[:-1] + (1,)), energy], axis=-1)
+    e_lag = energy[..., window:window + tau_max + 1] - energy[..., :tau_max + 1]
+    diff = np.maximum(e_lag[..., :1] + e_lag - 2.0 * r, 0.0)
+
+    # Cumulative mean normalized difference, d'(0) = 1
+    cumulative = np.cumsum(diff[..., 1:], axis=-1)
+    cmnd = np.ones_like(diff)
+    cmnd[..., 1:] = diff[..., 1:] * np.arange(1, tau_max + 1) / np.maximum(cumulative, 1e-12)
+
+    # First local minimum under the threshold in [tau_min, tau_max)
+    lags = cmnd[..., tau_min:tau_max]
+    next_lags = cmnd[..., tau_min + 1:tau_max + 1]
+    candidates = (lags < threshold) & (lags <= next_lags)
+    voiced = candidates.any(axis=-1)
+    tau = tau_min + np.argmax(candidates, axis=-1)
+
+    # The candidate is the bottom of the first dip (lags before it were still falling), refine it
+    # with parabolic interpolation
+    tau_index = tau[..., None]
+    left = np.take_along_axis(cmnd, tau_index - 1, axis=-1)[..., 0]
+    center = np.take_along_axis(cmnd, tau_index, axis=-1)[..., 0]
+    right = np.take_along_axis(cmnd, np.minimum(tau_index + 1, tau_max), axis=-1)[..., 0]
+    denominator = left - 2.0 * center + right
+    shift = np.where(np.abs(denominator) > 1e-12, 0.5 * (left - right) / np.where(denominator == 0, 1, denominator), 0.0)
+    period = tau + np.clip(shift, -1.0, 1.0)
+
+    # Silent frames are unvoiced, judged against each clip's global peak like Praat
+    half = frame_length // 2
+    frame_peak = np.abs(frames[..., half - window // 2:half + window // 2 + 1]).max(axis=-1)
+    clip_peak = np.abs(signals).max(axis=-1, keepdims=True) if reference_peak is None else reference_peak
+    voiced &= frame_peak > SILENCE_THRESHOLD * clip_peak
+
+    f0 = np.where(voiced, sr / period, 0.0)
+    f0 = np.where((f0 >= min_f0) & (f0 <= max_f0), f0, 0.0)
+    return f0 if np.ndim(y) == 2 else f0[0]
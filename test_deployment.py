@@ -1,53 +1,61 @@
 #!/usr/bin/env python3
 """
 Test script to verify Blob Storage and audio comparison are working
+(STORAGE_BACKEND=filesystem checks STORAGE_DIR instead, with no network)
 """
+import asyncio
 import os
 import sys
+import httpx
 import requests
 from dotenv import load_dotenv
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
 
 load_dotenv()
 
+from storage import STORAGE_BACKEND, make_storage
+
 BLOB_TOKEN = os.getenv("BLOB_READ_WRITE_TOKEN")
 
+def list_blobs() -> dict:
+    """List all blobs in storage through the app's storage backend"""
+    async def _list():
+        storage = make_storage()
+        if STORAGE_BACKEND == "vercel":
+            storage.max_retries = 0
+        try:
+            return {"blobs": await storage.list_all()}
+        finally:
+            await storage.aclose()
+    return asyncio.run(_list())
+
 def test_blob_connection():
     """Test connection to Vercel Blob Storage"""
     print("=" * 60)
-    print("🧪 TEST 1: Vercel Blob Connection")
+    print(f"🧪 TEST 1: Storage Connection ({STORAGE_BACKEND})")
     print("=" * 60)
     
-    if not BLOB_TOKEN:
-        print("❌ BLOB_READ_WRITE_TOKEN not found in .env")
-        return False
-    
-    print(f"✅ Token found: {BLOB_TOKEN[:20]}...")
-    
-    headers = {
-        "Authorization": f"Bearer {BLOB_TOKEN}",
-    }
+    if STORAGE_BACKEND == "vercel":
+        if not BLOB_TOKEN:
+            print("❌ BLOB_READ_WRITE_TOKEN not found in .env")
+            return False
+        print(f"✅ Token found: {BLOB_TOKEN[:20]}...")
     
     try:
-        response = requests.get(
-            "https://blob.vercel-storage.com/",
-            headers=headers
-        )
+        blobs = list_blobs().get("blobs", [])
+        print(f"✅ Connected to Blob Storage")
+        print(f"✅ Found {len(blobs)} files")
         
-        if response.status_code == 200:
-            blobs = response.json().get("blobs", [])
-            print(f"✅ Connected to Blob Storage")
-            print(f"✅ Found {len(blobs)} files")
-            
-            for blob in blobs:
-                print(f"   📁 {blob['pathname']} ({blob['size']} bytes)")
-            
-            return True
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            return False
+        for blob in blobs:
+            print(f"   📁 {blob['pathname']} ({blob['size']} bytes)")
+        
+        return True
+    except httpx.HTTPStatusError as e:
+        print(f"❌ Failed: {e.response.status_code}")
+        return False
     except Exception as e:
         print(f"❌ Error: {e}")
         return False
@@ -58,30 +66,20 @@ def test_base_wav_exists():
     print("🧪 TEST 2: base.wav Availability")
     print("=" * 60)
     
-    headers = {
-        "Authorization": f"Bearer {BLOB_TOKEN}",
-    }
-    
     try:
-        response = requests.get(
-            "https://blob.vercel-storage.com/",
-            headers=headers
-        )
+        blobs = list_blobs().get("blobs", [])
         
-        if response.status_code == 200:
-            blobs = response.json().get("blobs", [])
-            
-            for blob in blobs:
-                if blob.get("pathname") == "base.wav":
-                    print(f"✅ base.wav found!")
-                    print(f"   📊 Size: {blob['size']} bytes")
-                    print(f"   🔗 URL: {blob['url']}")
-                    print(f"   📅 Uploaded: {blob['uploadedAt']}")
-                    return True
-            
-            print("❌ base.wav NOT found in Blob Storage")
-            print("   Run: python3 upload_base_to_blob.py")
-            return False
+        for blob in blobs:
+            if blob.get("pathname") == "base.wav":
+                print(f"✅ base.wav found!")
+                print(f"   📊 Size: {blob['size']} bytes")
+                print(f"   🔗 URL: {blob['url']}")
+                print(f"   📅 Uploaded: {blob['uploadedAt']}")
+                return True
+        
+        print("❌ base.wav NOT found in Blob Storage")
+        print("   Run: python3 upload_base_to_blob.py")
+        return False
     except Exception as e:
         print(f"❌ Error: {e}")
         return False
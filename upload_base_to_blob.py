@@ -2,47 +2,32 @@
 """
 Script to upload base.wav to Vercel Blob Storage
 Run this once to upload your base audio file to the cloud
+(or, with STORAGE_BACKEND=filesystem, to STORAGE_DIR for a local server)
 """
+import asyncio
 import os
-import requests
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
 load_dotenv()
 
+from storage import STORAGE_BACKEND, make_storage
+
 BLOB_TOKEN = os.getenv("BLOB_READ_WRITE_TOKEN")
 BASE_AUDIO_PATH = "audio/base.wav"
 
-def upload_to_blob(file_content: bytes, filename: str) -> str:
-    """Upload file to Vercel Blob Storage and return the URL"""
+async def upload_to_blob(file_content: bytes, filename: str) -> str:
+    """Upload file to the configured storage and return the URL"""
+    storage = make_storage()
     try:
-        print(f"Uploading {filename} to Vercel Blob...")
-        
-        headers = {
-            "Authorization": f"Bearer {BLOB_TOKEN}",
-        }
-        
-        # Use Vercel Blob API to upload
-        response = requests.put(
-            f"https://blob.vercel-storage.com/{filename}",
-            headers=headers,
-            data=file_content,
-            params={"filename": filename}
-        )
-        
-        if response.status_code == 200:
-            blob_url = response.json().get("url")
-            print(f"✅ Successfully uploaded to: {blob_url}")
-            return blob_url
-        else:
-            print(f"❌ Failed to upload: {response.status_code} - {response.text}")
-            return None
-            
-    except Exception as e:
-        print(f"❌ Error uploading: {e}")
-        return None
+        return await storage.put(filename, file_content)
+    finally:
+        await storage.aclose()
 
 def main():
-    if not BLOB_TOKEN:
+    if STORAGE_BACKEND == "vercel" and not BLOB_TOKEN:
         print("❌ BLOB_READ_WRITE_TOKEN not found in .env file")
         return
     
@@ -56,12 +41,14 @@ def main():
     
     print(f"📦 File size: {len(content)} bytes")
     
-    blob_url = upload_to_blob(content, "base.wav")
+    blob_url = asyncio.run(upload_to_blob(content, "base.wav"))
     
     if blob_url:
-        print("\n✨ Base audio successfully uploaded to Vercel Blob Storage!")
+        print(f"\n✨ Base audio successfully uploaded to {STORAGE_BACKEND} storage!")
         print(f"🔗 URL: {blob_url}")
         print("\nYour app will now use this file in production.")
+        print("If the server is already running, reload its baseline with:")
+        print('   curl -X POST -H "X-Admin-Token: $ADMIN_TOKEN" <api-url>/admin/reload-baseline')
     else:
         print("\n❌ Upload failed. Please check your BLOB_READ_WRITE_TOKEN.")
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Equivalence check for the feature extraction pipeline.
+
+Compares the current single-decode extractor (one 16 kHz mono buffer shared by
+Praat and librosa) against the original two-decode pipeline on audio/base.wav
+and a few synthetic tones, and fails if the drift exceeds the bounds below.
+
+Run from the repo root: python3 verify_features.py
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+import librosa
+import parselmouth
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from feature_engine import SAMPLE_RATE, MIN_F0, MAX_F0, extract_audio_features
+
+BASE_AUDIO_PATH = "audio/base.wav"
+
+# Allowed drift between the original and the current pipeline
+TOLERANCES = {
+    "avg_pitch": 0.01,          # relative
+    "pitch_variability": 0.10,  # relative
+    "avg_energy": 0.01,         # relative
+    "voicing_ratio": 0.03,      # absolute
+    "duration": 0.01,           # absolute (seconds)
+}
+RELATIVE_KEYS = {"avg_pitch", "pitch_variability", "avg_energy"}
+# Absolute differences below this always pass (a pure tone has ~0 Hz variability)
+ABSOLUTE_SLACK = 0.05
+# Median absolute difference of the pitch track on frames voiced in both (Hz)
+MAX_PITCH_TRACK_DRIFT = 2.0
+
+
+def legacy_extract(audio_path: str):
+    """The original pipeline: Praat decodes at the native rate, librosa decodes again"""
+    sound = parselmouth.Sound(audio_path)
+    duration = sound.get_total_duration()
+    pitch = sound.to_pitch(time_step=0.01, pitch_floor=MIN_F0, pitch_ceiling=MAX_F0)
+    pitch_time_series = pitch.selected_array['frequency']
+    voiced = pitch_time_series[pitch_time_series > 0]
+
+    y, sr = librosa.load(audio_path, sr=SAMPLE_RATE)
+    rms_time_series = librosa.feature.rms(y=y, frame_length=2048, hop_length=512)[0]
+
+    return {
+        "avg_pitch": float(np.mean(voiced)) if len(voiced) else 0.0,
+        "pitch_variability": float(np.std(voiced)) if len(voiced) else 0.0,
+        "avg_energy": float(np.mean(rms_time_series)),
+        "voicing_ratio": len(voiced) / len(pitch_time_series) if len(pitch_time_series) else 0.0,
+        "duration": duration,
+        "pitch_time_series": pitch_time_series,
+    }
+
+
+def synthetic_clips(directory: str):
+    """A steady tone, a pitch glide and a tone with silent gaps, at common native rates"""
+    clips = []
+    for rate in (44100, 48000):
+        t = np.arange(int(3.0 * rate)) / rate
+
+        steady = 0.2 * np.sin(2 * np.pi * 300.0 * t)
+        glide = 0.2 * np.sin(2 * np.pi * (200.0 * t + 50.0 * t ** 2))
+        gated = steady * (np.sin(2 * np.pi * 1.0 * t) > 0)
+
+        for name, signal in (("steady", steady), ("glide", glide), ("gated", gated)):
+            path = os.path.join(directory, f"{name}_{rate}.wav")
+            sf.write(path, signal.astype(np.float32), rate)
+            clips.append(path)
+    return clips
+
+
+def compare(audio_path: str) -> bool:
+    expected = legacy_extract(audio_path)
+    actual = extract_audio_features(audio_path)
+    if not actual:
+        print(f"❌ {os.path.basename(audio_path)}: extraction failed")
+        return False
+
+    passed = True
+    print(f"\n📁 {os.path.basename(audio_path)}")
+    for key, tolerance in TOLERANCES.items():
+        diff = abs(actual[key] - expected[key])
+        ok = diff <= ABSOLUTE_SLACK
+        if key in RELATIVE_KEYS:
+            diff = diff / abs(expected[key]) if expected[key] else diff
+        ok = ok or diff <= tolerance
+        passed = passed and ok
+        print(f"   {'✅' if ok else '❌'} {key:<18} legacy={expected[key]:<10.4f} current={actual[key]:<10.4f} drift={diff:.4f}")
+
+    legacy_track = expected["pitch_time_series"]
+    current_track = np.asarray(actual["pitch_time_series"])
+    frames = min(len(legacy_track), len(current_track))
+    both_voiced = (legacy_track[:frames] > 0) & (current_track[:frames] > 0)
+    if both_voiced.any():
+        drift = float(np.median(np.abs(legacy_track[:frames][both_voiced] - current_track[:frames][both_voiced])))
+        ok = drift <= MAX_PITCH_TRACK_DRIFT
+        passed = passed and ok
+        print(f"   {'✅' if ok else '❌'} {'pitch track':<18} median drift={drift:.3f} Hz over {int(both_voiced.sum())} frames")
+
+    return passed
+
+
+def main():
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = synthetic_clips(directory)
+        if os.path.exists(BASE_AUDIO_PATH):
+            paths.insert(0, BASE_AUDIO_PATH)
+        else:
+            print(f"⚠️ {BASE_AUDIO_PATH} not found, checking synthetic clips only")
+
+        for path in paths:
+            results.append(compare(path))
+
+    print("\n" + "=" * 60)
+    if all(results):
+        print("🎉 All clips within drift bounds")
+    else:
+        print(f"❌ {results.count(False)} of {len(results)} clips exceeded drift bounds")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()